@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Compares prompt size over long synthetic chats, with and without ConversationContext
+# compaction. Latency is not measured against Gemini: the "modelled ms" columns are derived
+# from the token counts with the cost model below. Only compaction time is measured.
+#
+#   uv run python benchmarks/context_benchmark.py --turns 50
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from context_manager import ConversationContext, estimate_tokens
+
+# Rough flash-model cost model: fixed overhead plus prefill time per prompt token
+BASE_LATENCY_MS = 350.0
+PER_TOKEN_MS = 0.12
+
+def synthetic_turn(turn: int):
+    if turn % 3 == 0:
+        events = [{
+            'id': f'evt{turn}_{i}',
+            'summary': f'Sync meeting {i}',
+            'start': f'2025-10-{(i % 28) + 1:02d}T09:00:00+05:45',
+            'end': f'2025-10-{(i % 28) + 1:02d}T09:30:00+05:45',
+            'description': 'Weekly sync to go over the roadmap, blockers and action items. ' * 3,
+            'location': 'Meeting room 3',
+            'status': 'confirmed',
+            'attendees': [{'email': f'user{j}@example.com', 'displayName': f'User {j}', 'responseStatus': 'accepted'} for j in range(3)]
+        } for i in range(10)]
+        return (f"What meetings do I have coming up? (turn {turn})",
+                [('list_events', json.dumps(events, indent=2))],
+                "You have 10 upcoming meetings: " + ", ".join(e['summary'] for e in events) + ".")
+    if turn % 3 == 1:
+        emails = [{
+            'id': f'msg{turn}_{i}',
+            'subject': f'Invoice #{turn}{i}',
+            'sender': 'billing@example.com',
+            'date': 'Mon, 13 Oct 2025 10:00:00 +0545',
+            'body': 'Please find attached the invoice for this month. ' * 10,
+            'snippet': 'Please find attached the invoice'
+        } for i in range(5)]
+        return (f"Any new emails about invoices? (turn {turn})",
+                [('search_emails', json.dumps(emails, indent=2))],
+                "I found 5 invoice emails from billing@example.com.")
+    return (f"Create a meeting tomorrow at 3pm called Review {turn}",
+            [('create_event', json.dumps({"success": True, "event_id": f"new{turn}", "event_link": "https://calendar.google.com/x", "message": "Event created successfully"}, indent=2))],
+            f"Created 'Review {turn}' for tomorrow at 3 PM.")
+
+def modelled_latency_ms(prompt_tokens: int) -> float:
+    return BASE_LATENCY_MS + PER_TOKEN_MS * prompt_tokens
+
+def run(turns: int, budget: int):
+    unbounded = []
+    context = ConversationContext(token_budget=budget)
+    rows = []
+    for turn in range(turns):
+        query, tool_results, answer = synthetic_turn(turn)
+
+        unbounded_tokens = sum(estimate_tokens(str(m.content)) for m in unbounded) + estimate_tokens(query)
+
+        start = time.perf_counter()
+        history = context.build_history(query)
+        compaction_ms = (time.perf_counter() - start) * 1000
+        compact_tokens = context.count_tokens(history, query)
+
+        rows.append((turn + 1, unbounded_tokens, modelled_latency_ms(unbounded_tokens),
+                     compact_tokens, modelled_latency_ms(compact_tokens) + compaction_ms, compaction_ms))
+
+        unbounded.append(HumanMessage(content=query))
+        for _, result in tool_results:
+            unbounded.append(AIMessage(content=result))
+        unbounded.append(AIMessage(content=answer))
+        context.record_turn(query, answer, tool_results)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=6000)
+    args = parser.parse_args()
+
+    rows = run(args.turns, args.budget)
+    print(f"{'turn':>5} {'unbounded tok':>14} {'modelled ms':>12} {'compact tok':>12} {'modelled ms':>12} {'compaction ms':>14}")
+    for row in rows:
+        if row[0] == 1 or row[0] % 5 == 0:
+            print(f"{row[0]:>5} {row[1]:>14} {row[2]:>12.0f} {row[3]:>12} {row[4]:>12.0f} {row[5]:>14.3f}")
+
+    print()
+    print(f"max prompt tokens: unbounded={max(r[1] for r in rows)} compact={max(r[3] for r in rows)} (budget {args.budget})")
+    print(f"last-turn modelled latency: unbounded={rows[-1][2]:.0f}ms compact={rows[-1][4]:.0f}ms")
+    print(f"(modelled ms = {BASE_LATENCY_MS:.0f} ms + {PER_TOKEN_MS} ms per prompt token, derived from the token columns, "
+          "not measured; compaction ms is measured)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Measures local expansion of large recurring sets with the recurrence engine.
+#
+#   uv run python benchmarks/recurrence_benchmark.py --series 500 --days 365
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytz
+from recurrence import EventStore
+
+TIMEZONE = pytz.timezone('America/New_York')
+RULES = [
+    'RRULE:FREQ=DAILY',
+    'RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR',
+    'RRULE:FREQ=DAILY;INTERVAL=2;COUNT=400',
+    'RRULE:FREQ=MONTHLY;BYMONTHDAY=1,15',
+    'RRULE:FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20271231T000000Z',
+]
+
+def synthetic_store(series_count: int, start: datetime):
+    store = EventStore(TIMEZONE)
+    items = []
+    for i in range(series_count):
+        first = start - timedelta(days=i % 200) + timedelta(hours=i % 9)
+        master_id = f'series{i}'
+        items.append({
+            'id': master_id,
+            'summary': f'Recurring meeting {i}',
+            'start': {'dateTime': TIMEZONE.localize(first).isoformat(), 'timeZone': TIMEZONE.zone},
+            'end': {'dateTime': TIMEZONE.localize(first + timedelta(minutes=30)).isoformat(), 'timeZone': TIMEZONE.zone},
+            'recurrence': [RULES[i % len(RULES)]],
+        })
+        # A couple of moved and cancelled occurrences per series
+        for offset, status in ((3, 'confirmed'), (5, 'cancelled')):
+            original = first + timedelta(days=offset * 7)
+            items.append({
+                'id': f'{master_id}_{offset}',
+                'recurringEventId': master_id,
+                'status': status,
+                'originalStartTime': {'dateTime': TIMEZONE.localize(original).isoformat()},
+                'start': {'dateTime': TIMEZONE.localize(original + timedelta(hours=1)).isoformat()},
+                'end': {'dateTime': TIMEZONE.localize(original + timedelta(hours=1, minutes=30)).isoformat()},
+            })
+    store.apply(items)
+    return store
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--first", type=int, default=10)
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 1, 9, 0)
+    window_start = TIMEZONE.localize(start)
+    window_end = window_start + timedelta(days=args.days)
+
+    store, build_ms = timed(lambda: synthetic_store(args.series, start))
+    _, series_ms = timed(store.all_series)
+
+    # Each measurement gets freshly built series: rule sets cache what they expand, and
+    # list_events pays the cold cost after every sync
+    def cold(measure):
+        all_series = synthetic_store(args.series, start).all_series()
+        return timed(lambda: measure(all_series))
+
+    total, expand_ms = cold(lambda all_series: sum(sum(1 for _ in s.instances(window_start, window_end)) for s in all_series))
+    _, first_ms = cold(lambda all_series: [list(islice(s.instances(window_start, window_end), args.first)) for s in all_series])
+    summaries, summary_ms = cold(lambda all_series: [s.summarize(window_start, window_end) for s in all_series])
+
+    print(f"series: {args.series}, window: {args.days} days")
+    print(f"store apply:                 {build_ms:9.1f} ms")
+    print(f"build rule sets:             {series_ms:9.1f} ms")
+    print(f"expand all instances:        {expand_ms:9.1f} ms ({total} instances, {expand_ms * 1000 / max(total, 1):.1f} us each)")
+    print(f"first {args.first} per series (lazy):  {first_ms:9.1f} ms")
+    print(f"series summaries:            {summary_ms:9.1f} ms ({len([s for s in summaries if s])} summaries instead of {total} events)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Breaks down MCP server import time and measures time-to-first-tool-response for each
+# launch mode: `uv run` (the old config), the venv interpreter directly, and the zygote.
+#
+#   uv run python benchmarks/startup_benchmark.py --runs 5
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from mcp_launcher import LAUNCHER_PATH, zygote_supported
+
+FIRST_TOOL = {"calendar": "get_calendar_timezone_info", "gmail": "get_gmail_timezone_info"}
+
+def import_breakdown(module: str, top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    packages = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0) + int(self_us)
+        total += int(self_us)
+    print(f"\n{module}: {total / 1000:.0f} ms of imports")
+    for root, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {root:<28} {self_us / 1000:8.1f} ms")
+
+def _rpc(proc, message: dict):
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+def _read_result(proc, request_id: int):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("server exited before answering")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+def first_tool_response_ms(command: list, server: str, env: dict):
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        _rpc(proc, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "startup-benchmark", "version": "1.0"}
+        }})
+        _read_result(proc, 1)
+        _rpc(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _rpc(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": FIRST_TOOL[server], "arguments": {}}})
+        _read_result(proc, 2)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def measure(label: str, command: list, server: str, env: dict, runs: int):
+    samples = [first_tool_response_ms(command, server, env) for _ in range(runs)]
+    print(f"  {label:<10} median {statistics.median(samples):8.1f} ms   min {min(samples):8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--server", choices=sorted(FIRST_TOOL), default="calendar")
+    args = parser.parse_args()
+
+    import_breakdown(f"{args.server}_mcp_server", args.top)
+
+    # No Google credentials: the first tool answers from the default timezone without network calls
+    env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_ACCESS_TOKEN", "GOOGLE_OAUTH_CREDENTIALS")}
+    script = f"{args.server}_mcp_server.py"
+    print(f"\ntime to first tool response ({args.server}, {args.runs} runs)")
+    if shutil.which("uv"):
+        measure("uv run", ["uv", "run", "python", script], args.server, env, args.runs)
+    measure("direct", [sys.executable, script], args.server, env, args.runs)
+
+    if not zygote_supported():
+        print("  zygote     not supported on this platform")
+        return
+    socket_path = os.path.join(tempfile.mkdtemp(), "zygote.sock")
+    start = time.perf_counter()
+    zygote = subprocess.Popen([sys.executable, LAUNCHER_PATH, "zygote", socket_path], cwd=BACKEND_DIR,
+                              stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        zygote.stderr.readline()
+        print(f"  (zygote warm-up, paid once: {(time.perf_counter() - start) * 1000:.1f} ms)")
+        measure("zygote", [sys.executable, "-S", LAUNCHER_PATH, "connect", args.server],
+                args.server, dict(env, MCP_ZYGOTE_SOCKET=socket_path), args.runs)
+    finally:
+        zygote.terminate()
+        zygote.wait()
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,37 @@
 #!/usr/bin/env python3
 
 import json
-from datetime import timedelta
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import islice
 from fastmcp import FastMCP
-from google_service_utils import GoogleServiceBase, initialize_google_service, get_timezone_info, parse_datetime_string
+from googleapiclient.errors import HttpError
+from google_service_utils import GoogleServiceBase, initialize_google_service, get_timezone_info, parse_datetime_string, cache_invalidated_at
+from recurrence import EventStore, RecurringSeries, parse_google_time
 import pytz
 
 mcp = FastMCP("calendar-mcp-server")
 
+CALENDAR_LIST_TTL = 60
+EVENT_SYNC_TTL = 30
+BATCH_LIMIT = 50
+EDIT_SCOPES = ('instance', 'series', 'following')
+# A series with more occurrences than this in the listed window is summarised rather than listed
+SERIES_SUMMARY_THRESHOLD = 3
+
 class CalendarService(GoogleServiceBase):
     def __init__(self):
         super().__init__('calendar', 'v3', [
             "https://www.googleapis.com/auth/calendar",
             "https://www.googleapis.com/auth/calendar.events"
         ])
+        self._calendars = {}
+        self._calendar_sync_token = None
+        self._calendars_checked_at = 0
+        self._calendar_lock = threading.RLock()
+        self._event_stores = {}
     
     def _get_user_timezone(self):
         import os
@@ -22,18 +40,157 @@ class CalendarService(GoogleServiceBase):
             self.user_timezone = pytz.timezone(manual_tz)
             return
         try:
-            calendar = self.service.calendarList().list().execute()
-            for cal in calendar.get('items', []):
-                if cal.get('primary'):
-                    details = self.service.calendars().get(calendarId=cal['id']).execute()
-                    tz = details.get('timeZone')
-                    if tz:
-                        self.user_timezone = pytz.timezone(tz)
-                        return
+            for cal in self.get_calendars():
+                if cal.get('primary') and cal.get('timeZone'):
+                    self.user_timezone = pytz.timezone(cal['timeZone'])
+                    return
         except:
             pass
         self.user_timezone = pytz.timezone('Asia/Kathmandu')
 
+    def get_calendars(self, force_refresh: bool = False):
+        with self._calendar_lock:
+            if (force_refresh or time.time() - self._calendars_checked_at > CALENDAR_LIST_TTL
+                    or cache_invalidated_at('calendar') > self._calendars_checked_at):
+                self._sync_calendar_list()
+            return list(self._calendars.values())
+
+    def _sync_calendar_list(self):
+        # Incremental sync: with a sync token only entries changed since the last call come back
+        params = {'showDeleted': True} if self._calendar_sync_token else {}
+        if self._calendar_sync_token:
+            params['syncToken'] = self._calendar_sync_token
+        calendars = dict(self._calendars) if self._calendar_sync_token else {}
+        try:
+            while True:
+                result = self.service.calendarList().list(**params).execute()
+                for cal in result.get('items', []):
+                    if cal.get('deleted'):
+                        calendars.pop(cal['id'], None)
+                    else:
+                        calendars[cal['id']] = cal
+                if not result.get('nextPageToken'):
+                    break
+                params['pageToken'] = result['nextPageToken']
+        except HttpError as e:
+            if e.resp.status == 410 and self._calendar_sync_token:
+                self._calendar_sync_token = None
+                return self._sync_calendar_list()
+            raise
+        self._calendars = calendars
+        self._calendar_sync_token = result.get('nextSyncToken')
+        self._calendars_checked_at = time.time()
+
+    def primary_calendar_id(self):
+        # 'primary' and the user's own calendar id name the same calendar; event stores are
+        # keyed by the real id so it is synced and invalidated once
+        try:
+            return next((cal['id'] for cal in self.get_calendars() if cal.get('primary')), 'primary')
+        except HttpError:
+            return 'primary'
+
+    def resolve_calendar_ids(self, calendar_ids: str):
+        if not calendar_ids or calendar_ids.strip().lower() == 'primary':
+            return [self.primary_calendar_id()]
+        if calendar_ids.strip().lower() == 'all':
+            return [cal['id'] for cal in self.get_calendars()]
+        calendars = self.get_calendars()
+        resolved = []
+        for name in calendar_ids.split(','):
+            name = name.strip()
+            if not name:
+                continue
+            if name.lower() == 'primary':
+                name = self.primary_calendar_id()
+            match = next((cal['id'] for cal in calendars
+                          if name == cal['id'] or name.lower() == cal.get('summary', '').lower()
+                          or name.lower() == cal.get('summaryOverride', '').lower()), name)
+            if match not in resolved:
+                resolved.append(match)
+        return resolved or [self.primary_calendar_id()]
+
+    def batch_execute(self, requests: dict):
+        # One HTTP round trip per BATCH_LIMIT calendars instead of one per calendar
+        results, errors = {}, {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                errors[request_id] = exception
+            else:
+                results[request_id] = response
+
+        items = list(requests.items())
+        for i in range(0, len(items), BATCH_LIMIT):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for request_id, request in items[i:i + BATCH_LIMIT]:
+                batch.add(request, request_id=request_id)
+            batch.execute()
+        return results, errors
+
+    def get_event_stores(self, calendar_ids: list):
+        # Series masters and one-off events are fetched once per calendar and then kept
+        # current with incremental syncs, so any window can be expanded locally
+        stores, errors = {}, {}
+        with self._calendar_lock:
+            stale = {}
+            invalidated_at = cache_invalidated_at('calendar')
+            for calendar_id in calendar_ids:
+                if calendar_id not in self._event_stores:
+                    self._event_stores[calendar_id] = EventStore(self.get_user_timezone())
+                stores[calendar_id] = self._event_stores[calendar_id]
+                checked_at = stores[calendar_id].checked_at
+                if time.time() - checked_at > EVENT_SYNC_TTL or invalidated_at > checked_at:
+                    stale[calendar_id] = stores[calendar_id]
+            if len(stale) > 1:
+                first_pages, failed = self.batch_execute({
+                    calendar_id: self._events_sync_request(calendar_id, store)
+                    for calendar_id, store in stale.items()
+                })
+            else:
+                first_pages, failed = {}, {}
+            for calendar_id, store in stale.items():
+                try:
+                    if isinstance(failed.get(calendar_id), HttpError) and failed[calendar_id].resp.status != 410:
+                        raise failed[calendar_id]
+                    self._sync_events(calendar_id, store, first_pages.get(calendar_id))
+                except HttpError as e:
+                    errors[calendar_id] = e
+                    del stores[calendar_id]
+        return stores, errors
+
+    def _events_sync_request(self, calendar_id: str, store: EventStore, page_token: str = None):
+        # Without showDeleted the first sync skips long-deleted events; cancelled instances of
+        # recurring events still come back, and incremental syncs always include deletions
+        params = {'calendarId': calendar_id, 'singleEvents': False, 'maxResults': 2500}
+        if store.sync_token:
+            params['syncToken'] = store.sync_token
+        if page_token:
+            params['pageToken'] = page_token
+        return self.service.events().list(**params)
+
+    def _sync_events(self, calendar_id: str, store: EventStore, result: dict = None):
+        try:
+            if result is None:
+                result = self._events_sync_request(calendar_id, store).execute()
+            store.apply(result.get('items', []))
+            while result.get('nextPageToken'):
+                result = self._events_sync_request(calendar_id, store, result['nextPageToken']).execute()
+                store.apply(result.get('items', []))
+        except HttpError as e:
+            if e.resp.status == 410 and store.sync_token:
+                store.reset()
+                return self._sync_events(calendar_id, store)
+            raise
+        store.sync_token = result.get('nextSyncToken')
+        store.checked_at = time.time()
+
+    def invalidate_events(self, calendar_id: str):
+        if calendar_id == 'primary':
+            calendar_id = self.primary_calendar_id()
+        store = self._event_stores.get(calendar_id)
+        if store:
+            store.checked_at = 0
+
 calendar_service = CalendarService()
 
 @mcp.tool()
@@ -42,61 +199,187 @@ def get_calendar_timezone_info():
         initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
     return get_timezone_info(calendar_service)
 
-@mcp.tool()
-def list_events(max_results: int = 10, time_min: str = None, time_max: str = None):
-    print(f"list_events called: max_results={max_results}, time_min={time_min}, time_max={time_max}")
-    if not calendar_service.service:
-        print("Initializing calendar service...")
-        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
+def _format_event(event, calendar_id: str = 'primary'):
+    attendees = []
+    if 'attendees' in event:
+        for attendee in event['attendees']:
+            attendees.append({
+                'email': attendee.get('email', ''),
+                'displayName': attendee.get('displayName', ''),
+                'responseStatus': attendee.get('responseStatus', 'needsAction')
+            })
+    return {
+        'id': event['id'],
+        'calendar_id': calendar_id,
+        'summary': event.get('summary', 'No Title'),
+        'start': event['start'].get('dateTime', event['start'].get('date')),
+        'end': event['end'].get('dateTime', event['end'].get('date')),
+        'description': event.get('description', ''),
+        'location': event.get('location', ''),
+        'status': event.get('status', ''),
+        'attendees': attendees
+    }
+
+def _formatted(events, calendar_id: str):
+    # Binds calendar_id now; a bare generator expression would read the loop variable lazily
+    return (_format_event(event, calendar_id) for event in events)
+
+def _start_sort_key(value: str):
+    # Offsets differ between calendars and all-day events only carry a date, so compare as UTC
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = calendar_service.get_user_timezone().localize(dt)
+    return dt.astimezone(pytz.utc)
+
+def _merge_by_start(per_calendar: list, limit: int = None):
+    # Each calendar's list is already ordered by start time, so a k-way heap merge is enough
+    merged = heapq.merge(*per_calendar, key=lambda event: _start_sort_key(event['start']))
+    events = []
+    for event in merged:
+        events.append(event)
+        if limit and len(events) >= limit:
+            break
+    return events
+
+def _resolve_time_range(time_min: str = None, time_max: str = None):
     if not time_min:
         time_min = calendar_service.get_current_user_time().isoformat()
     if not time_max:
         time_max = (calendar_service.get_current_user_time() + timedelta(days=30)).isoformat()
-    
-    if time_min:
-        time_min = parse_datetime_string(time_min, calendar_service.get_user_timezone())
-    if time_max:
-        time_max = parse_datetime_string(time_max, calendar_service.get_user_timezone())
-    
-    events_result = calendar_service.service.events().list(
-        calendarId='primary',
-        timeMin=time_min,
-        timeMax=time_max,
-        maxResults=max_results,
-        singleEvents=True,
-        orderBy='startTime'
-    ).execute()
-    
-    events = events_result.get('items', [])
-    event_list = []
-    for event in events:
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        end = event['end'].get('dateTime', event['end'].get('date'))
-        
-        # Extract attendees
-        attendees = []
-        if 'attendees' in event:
-            for attendee in event['attendees']:
-                attendees.append({
-                    'email': attendee.get('email', ''),
-                    'displayName': attendee.get('displayName', ''),
-                    'responseStatus': attendee.get('responseStatus', 'needsAction')
-                })
-        
-        event_list.append({
-            'id': event['id'],
-            'summary': event.get('summary', 'No Title'),
-            'start': start,
-            'end': end,
-            'description': event.get('description', ''),
-            'location': event.get('location', ''),
-            'status': event.get('status', ''),
-            'attendees': attendees
-        })
-    return json.dumps(event_list, indent=2)
+    user_tz = calendar_service.get_user_timezone()
+    return parse_datetime_string(time_min, user_tz), parse_datetime_string(time_max, user_tz)
+
+def _fan_out_events(calendar_ids: list, max_results: int, **params):
+    requests = {
+        calendar_id: calendar_service.service.events().list(
+            calendarId=calendar_id,
+            maxResults=max_results,
+            singleEvents=True,
+            orderBy='startTime',
+            **params
+        )
+        for calendar_id in calendar_ids
+    }
+    if len(requests) == 1:
+        calendar_id, request = next(iter(requests.items()))
+        results, errors = {calendar_id: request.execute()}, {}
+    else:
+        results, errors = calendar_service.batch_execute(requests)
+    per_calendar = [
+        [_format_event(event, calendar_id) for event in results[calendar_id].get('items', [])]
+        for calendar_id in calendar_ids if calendar_id in results
+    ]
+    return _merge_by_start(per_calendar, max_results), errors
+
+def _events_response(events: list, errors: dict, series: list = None):
+    # Always one shape, whether or not any calendar failed or any series was summarised
+    response = {'events': events}
+    if series:
+        response['recurring_series'] = series
+    if errors:
+        response['errors'] = {calendar_id: str(error) for calendar_id, error in errors.items()}
+    return json.dumps(response, indent=2)
+
+@mcp.tool()
+def list_calendars():
+    if not calendar_service.service:
+        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
+    return json.dumps([{
+        'id': cal['id'],
+        'summary': cal.get('summaryOverride', cal.get('summary', '')),
+        'primary': cal.get('primary', False),
+        'access_role': cal.get('accessRole', ''),
+        'time_zone': cal.get('timeZone', ''),
+        'selected': cal.get('selected', False)
+    } for cal in calendar_service.get_calendars()], indent=2)
+
+@mcp.tool()
+def list_events(max_results: int = 10, time_min: str = None, time_max: str = None, calendar_ids: str = "primary", expand_recurring: bool = False):
+    print(f"list_events called: max_results={max_results}, time_min={time_min}, time_max={time_max}, calendar_ids={calendar_ids}, expand_recurring={expand_recurring}")
+    if not calendar_service.service:
+        print("Initializing calendar service...")
+        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
+    time_min, time_max = _resolve_time_range(time_min, time_max)
+    window_start, window_end = datetime.fromisoformat(time_min), datetime.fromisoformat(time_max)
+    stores, errors = calendar_service.get_event_stores(calendar_service.resolve_calendar_ids(calendar_ids))
+
+    # Series that repeat often in the window come back as one summary each unless the caller
+    # asks for every instance; the rest are listed with the other events
+    streams, series = [], []
+    for calendar_id, store in stores.items():
+        streams.append([_format_event(event, calendar_id) for event in store.singles_in_window(window_start, window_end)])
+        for recurring in store.all_series():
+            if expand_recurring:
+                streams.append(_formatted(recurring.instances(window_start, window_end), calendar_id))
+                continue
+            first = list(islice(recurring.instances(window_start, window_end), min(max_results, SERIES_SUMMARY_THRESHOLD) + 1))
+            if len(first) <= min(max_results, SERIES_SUMMARY_THRESHOLD):
+                streams.append([_format_event(instance, calendar_id) for instance in first])
+                continue
+            summary = recurring.summarize(window_start, window_end)
+            if summary:
+                summary['calendar_id'] = calendar_id
+                series.append(summary)
+    series.sort(key=lambda item: _start_sort_key(item['next_occurrences'][0]))
+    return _events_response(_merge_by_start(streams, max_results), errors, series)
+
+@mcp.tool()
+def search_events(query: str, max_results: int = 10, time_min: str = None, time_max: str = None, calendar_ids: str = "all"):
+    if not calendar_service.service:
+        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
+    time_min, time_max = _resolve_time_range(time_min, time_max)
+    events, errors = _fan_out_events(
+        calendar_service.resolve_calendar_ids(calendar_ids), max_results,
+        q=query, timeMin=time_min, timeMax=time_max
+    )
+    return _events_response(events, errors)
+
+@mcp.tool()
+def get_free_busy(time_min: str = None, time_max: str = None, calendar_ids: str = "all"):
+    if not calendar_service.service:
+        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
+    time_min, time_max = _resolve_time_range(time_min, time_max)
+    calendar_ids = calendar_service.resolve_calendar_ids(calendar_ids)
+    user_tz = calendar_service.get_user_timezone()
+
+    # freeBusy.query accepts at most 50 calendars per request
+    busy_by_calendar, errors = {}, {}
+    for i in range(0, len(calendar_ids), BATCH_LIMIT):
+        result = calendar_service.service.freebusy().query(body={
+            'timeMin': time_min,
+            'timeMax': time_max,
+            'timeZone': str(user_tz),
+            'items': [{'id': calendar_id} for calendar_id in calendar_ids[i:i + BATCH_LIMIT]]
+        }).execute()
+        for calendar_id, info in result.get('calendars', {}).items():
+            if info.get('errors'):
+                errors[calendar_id] = [err.get('reason', '') for err in info['errors']]
+            busy_by_calendar[calendar_id] = [
+                {'start': period['start'], 'end': period['end'], 'calendar_id': calendar_id}
+                for period in info.get('busy', [])
+            ]
+
+    merged = []
+    for period in _merge_by_start(list(busy_by_calendar.values())):
+        if merged and _start_sort_key(period['start']) <= _start_sort_key(merged[-1]['end']):
+            if _start_sort_key(period['end']) > _start_sort_key(merged[-1]['end']):
+                merged[-1]['end'] = period['end']
+            if period['calendar_id'] not in merged[-1]['calendars']:
+                merged[-1]['calendars'].append(period['calendar_id'])
+        else:
+            merged.append({'start': period['start'], 'end': period['end'], 'calendars': [period['calendar_id']]})
+
+    for period in merged:
+        period['start'] = _start_sort_key(period['start']).astimezone(user_tz).isoformat()
+        period['end'] = _start_sort_key(period['end']).astimezone(user_tz).isoformat()
+
+    response = {'time_min': time_min, 'time_max': time_max, 'busy': merged}
+    if errors:
+        response['errors'] = errors
+    return json.dumps(response, indent=2)
 
 @mcp.tool()
-def create_event(summary: str, start_time: str, end_time: str, description: str = "", location: str = "", attendees: str = ""):
+def create_event(summary: str, start_time: str, end_time: str, description: str = "", location: str = "", attendees: str = "", calendar_id: str = "primary", recurrence: str = ""):
     print(f"create_event called: {summary}, {start_time}, {end_time}, attendees: {attendees}")
     if not calendar_service.service:
         print("Initializing calendar service...")
@@ -125,7 +408,12 @@ def create_event(summary: str, start_time: str, end_time: str, description: str
         if attendee_list:
             event['attendees'] = attendee_list
     
-    created_event = calendar_service.service.events().insert(calendarId='primary', body=event).execute()
+    # Recurrence rules, e.g. "RRULE:FREQ=WEEKLY;BYDAY=MO,WE"; several lines may be separated by newlines
+    if recurrence:
+        event['recurrence'] = [line.strip() for line in recurrence.splitlines() if line.strip()]
+    
+    created_event = calendar_service.service.events().insert(calendarId=calendar_id, body=event).execute()
+    calendar_service.invalidate_events(calendar_id)
     return json.dumps({
         "success": True,
         "event_id": created_event['id'],
@@ -134,38 +422,15 @@ def create_event(summary: str, start_time: str, end_time: str, description: str
     }, indent=2)
 
 @mcp.tool()
-def get_event(event_id: str):
+def get_event(event_id: str, calendar_id: str = "primary"):
     if not calendar_service.service:
         initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
-    event = calendar_service.service.events().get(calendarId='primary', eventId=event_id).execute()
-    # Extract attendees
-    attendees = []
-    if 'attendees' in event:
-        for attendee in event['attendees']:
-            attendees.append({
-                'email': attendee.get('email', ''),
-                'displayName': attendee.get('displayName', ''),
-                'responseStatus': attendee.get('responseStatus', 'needsAction')
-            })
-    
-    return json.dumps({
-        'id': event['id'],
-        'summary': event.get('summary', 'No Title'),
-        'start': event['start'].get('dateTime', event['start'].get('date')),
-        'end': event['end'].get('dateTime', event['end'].get('date')),
-        'description': event.get('description', ''),
-        'location': event.get('location', ''),
-        'status': event.get('status', ''),
-        'html_link': event.get('htmlLink', ''),
-        'attendees': attendees
-    }, indent=2)
+    event = calendar_service.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+    details = _format_event(event, calendar_id)
+    details['html_link'] = event.get('htmlLink', '')
+    return json.dumps(details, indent=2)
 
-@mcp.tool()
-def update_event(event_id: str, summary: str = None, start_time: str = None, end_time: str = None, description: str = None, location: str = None, attendees: str = None):
-    if not calendar_service.service:
-        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
-    event = calendar_service.service.events().get(calendarId='primary', eventId=event_id).execute()
-    
+def _apply_event_changes(event, summary: str = None, start_time: str = None, end_time: str = None, description: str = None, location: str = None, attendees: str = None):
     if summary:
         event['summary'] = summary
     
@@ -195,22 +460,88 @@ def update_event(event_id: str, summary: str = None, start_time: str = None, end
         else:
             # Remove attendees if empty string provided
             event['attendees'] = []
-    
-    updated_event = calendar_service.service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+    return event
+
+def _get_series_target(event_id: str, calendar_id: str):
+    # Returns (instance or None, series master) for an instance id or a series id
+    event = calendar_service.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+    if not event.get('recurringEventId'):
+        return None, event
+    master = calendar_service.service.events().get(calendarId=calendar_id, eventId=event['recurringEventId']).execute()
+    return event, master
+
+def _is_first_occurrence(instance, recurring: RecurringSeries):
+    return instance is None or parse_google_time(instance['originalStartTime'], recurring.tz)[0] <= recurring.start
+
+@mcp.tool()
+def update_event(event_id: str, summary: str = None, start_time: str = None, end_time: str = None, description: str = None, location: str = None, attendees: str = None, calendar_id: str = "primary", scope: str = "instance"):
+    if not calendar_service.service:
+        initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
+    if scope not in EDIT_SCOPES:
+        return json.dumps({"success": False, "message": f"scope must be one of {', '.join(EDIT_SCOPES)}"}, indent=2)
+    changes = dict(summary=summary, start_time=start_time, end_time=end_time, description=description, location=location, attendees=attendees)
+
+    if scope == 'instance':
+        event = calendar_service.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+        _apply_event_changes(event, **changes)
+        updated_event = calendar_service.service.events().update(calendarId=calendar_id, eventId=event_id, body=event).execute()
+        calendar_service.invalidate_events(calendar_id)
+        return json.dumps({
+            "success": True,
+            "event_id": updated_event['id'],
+            "message": "Event updated successfully"
+        }, indent=2)
+
+    instance, master = _get_series_target(event_id, calendar_id)
+    recurring = RecurringSeries(master, calendar_service.get_user_timezone())
+    if scope == 'series' or _is_first_occurrence(instance, recurring):
+        _apply_event_changes(master, **changes)
+        updated_event = calendar_service.service.events().update(calendarId=calendar_id, eventId=master['id'], body=master).execute()
+        calendar_service.invalidate_events(calendar_id)
+        return json.dumps({
+            "success": True,
+            "event_id": updated_event['id'],
+            "message": "Recurring series updated successfully"
+        }, indent=2)
+
+    # This and following: end the original series before this occurrence and start a new one here
+    new_start = datetime.fromisoformat(parse_datetime_string(start_time, calendar_service.get_user_timezone())) if start_time else None
+    new_series = _apply_event_changes(recurring.following_series(instance, new_start), **changes)
+    master['recurrence'], _ = recurring.split_recurrence(instance['originalStartTime'])
+    calendar_service.service.events().update(calendarId=calendar_id, eventId=master['id'], body=master).execute()
+    created_event = calendar_service.service.events().insert(calendarId=calendar_id, body=new_series).execute()
+    calendar_service.invalidate_events(calendar_id)
     return json.dumps({
         "success": True,
-        "event_id": updated_event['id'],
-        "message": "Event updated successfully"
+        "event_id": created_event['id'],
+        "previous_series_id": master['id'],
+        "message": "This and following events updated successfully"
     }, indent=2)
 
 @mcp.tool()
-def delete_event(event_id: str):
+def delete_event(event_id: str, calendar_id: str = "primary", scope: str = "instance"):
     if not calendar_service.service:
         initialize_google_service(calendar_service, "Calendar", calendar_service.scopes)
-    calendar_service.service.events().delete(calendarId='primary', eventId=event_id).execute()
+    if scope not in EDIT_SCOPES:
+        return json.dumps({"success": False, "message": f"scope must be one of {', '.join(EDIT_SCOPES)}"}, indent=2)
+
+    if scope == 'instance':
+        calendar_service.service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+        message = "Event deleted successfully"
+    else:
+        instance, master = _get_series_target(event_id, calendar_id)
+        recurring = RecurringSeries(master, calendar_service.get_user_timezone())
+        if scope == 'series' or _is_first_occurrence(instance, recurring):
+            calendar_service.service.events().delete(calendarId=calendar_id, eventId=master['id']).execute()
+            message = "Recurring series deleted successfully"
+        else:
+            master['recurrence'], _ = recurring.split_recurrence(instance['originalStartTime'])
+            calendar_service.service.events().update(calendarId=calendar_id, eventId=master['id'], body=master).execute()
+            message = "This and following events deleted successfully"
+    calendar_service.invalidate_events(calendar_id)
     return json.dumps({
         "success": True,
-        "message": "Event deleted successfully"
+        "message": message
     }, indent=2)
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import json
+import os
+from langchain_core.messages import AIMessage, HumanMessage
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", 6000))
+DEFAULT_RECENT_TURNS = int(os.getenv("AGENT_CONTEXT_RECENT_TURNS", 4))
+DEFAULT_SUMMARY_TOKENS = int(os.getenv("AGENT_CONTEXT_SUMMARY_TOKENS", 800))
+
+DIGEST_KEYS = ('id', 'event_id', 'message_id', 'summary', 'subject', 'sender', 'start', 'success', 'message')
+
+def estimate_tokens(text: str) -> int:
+    # Gemini averages ~4 characters per token for English/JSON; close enough for budgeting
+    return len(text) // 4 + 1 if text else 0
+
+def _clip(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars - 3] + '...'
+
+def summarize_tool_result(tool_name: str, result: str, max_chars: int = 300) -> str:
+    try:
+        data = json.loads(result)
+    except (TypeError, ValueError):
+        return f"{tool_name}: {_clip(str(result), max_chars)}"
+    if isinstance(data, dict) and isinstance(data.get('events'), list):
+        # list_events / search_events wrap their events with optional series and errors
+        data = data['events']
+
+    if isinstance(data, list):
+        items = []
+        for item in data:
+            if isinstance(item, dict):
+                items.append(", ".join(f"{k}={item[k]}" for k in DIGEST_KEYS if item.get(k) not in (None, '')))
+            else:
+                items.append(str(item))
+        return _clip(f"{tool_name}: {len(data)} item(s) [" + "; ".join(items) + "]", max_chars)
+    if isinstance(data, dict):
+        fields = ", ".join(f"{k}={data[k]}" for k in DIGEST_KEYS if data.get(k) not in (None, ''))
+        return _clip(f"{tool_name}: {fields or json.dumps(data, separators=(',', ':'))}", max_chars)
+    return _clip(f"{tool_name}: {data}", max_chars)
+
+class ConversationContext:
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, recent_turns: int = DEFAULT_RECENT_TURNS,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS, tool_result_chars: int = 1500):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.tool_result_chars = tool_result_chars
+        self.turns = []
+        self.summary_lines = []
+
+    def record_turn(self, user_message: str, answer: str, tool_results: list = None):
+        self.turns.append({
+            "user": user_message,
+            "answer": answer,
+            "tool_results": list(tool_results or []),
+        })
+        while len(self.turns) > self.recent_turns:
+            self._fold_oldest_turn()
+
+    def _fold_oldest_turn(self):
+        self.summary_lines.append(self._summary_line(self.turns.pop(0)))
+        self._trim_summary(self.summary_lines)
+
+    def _summary_line(self, turn: dict) -> str:
+        line = f"User: {_clip(turn['user'], 160)} | Assistant: {_clip(turn['answer'], 200)}"
+        digests = [summarize_tool_result(name, result, 160) for name, result in turn['tool_results']]
+        if digests:
+            line += " | Tools: " + " / ".join(digests)
+        return line
+
+    def _trim_summary(self, summary_lines: list):
+        # Rolling summary: the oldest lines fall off once the summary exceeds its own budget
+        while len(summary_lines) > 1 and estimate_tokens("\n".join(summary_lines)) > self.summary_tokens:
+            summary_lines.pop(0)
+
+    def _render_turn(self, turn: dict, full_tool_results: bool) -> list:
+        messages = [HumanMessage(content=turn['user'])]
+        if turn['tool_results']:
+            if full_tool_results:
+                parts = [f"{name} returned: {_clip(str(result), self.tool_result_chars)}" for name, result in turn['tool_results']]
+            else:
+                parts = [summarize_tool_result(name, result) for name, result in turn['tool_results']]
+            messages.append(AIMessage(content="Tool results:\n" + "\n".join(parts)))
+        messages.append(AIMessage(content=turn['answer']))
+        return messages
+
+    def _render(self, turns: list, summary_lines: list, full_results_from: int) -> list:
+        history = []
+        if summary_lines:
+            history.append(AIMessage(content="Summary of earlier conversation:\n" + "\n".join(summary_lines)))
+        for index, turn in enumerate(turns):
+            history.extend(self._render_turn(turn, index >= full_results_from))
+        return history
+
+    def count_tokens(self, history: list, query: str = "") -> int:
+        return sum(estimate_tokens(str(message.content)) for message in history) + estimate_tokens(query)
+
+    def build_history(self, query: str = "") -> list:
+        # Only the latest turn keeps its (clipped) raw tool output; older ones are digested
+        history = self._render(self.turns, self.summary_lines, max(len(self.turns) - 1, 0))
+        if self.count_tokens(history, query) <= self.token_budget:
+            return history
+
+        # Over budget: trim a copy for this request only, so one long query does not
+        # discard context that later requests could still fit
+        turns, summary_lines = list(self.turns), list(self.summary_lines)
+        history = self._render(turns, summary_lines, len(turns))
+        while turns and self.count_tokens(history, query) > self.token_budget:
+            summary_lines.append(self._summary_line(turns.pop(0)))
+            self._trim_summary(summary_lines)
+            history = self._render(turns, summary_lines, len(turns))
+        while summary_lines and self.count_tokens(history, query) > self.token_budget:
+            summary_lines.pop(0)
+            history = self._render(turns, summary_lines, len(turns))
+        return history
+
+    def clear(self):
+        self.turns = []
+        self.summary_lines = []
+
+class ContextManagedAgent:
+    def __init__(self, agent, context: ConversationContext = None):
+        self.agent = agent
+        self.context = context or ConversationContext()
+        self.last_prompt_tokens = 0
+
+    async def run(self, query: str):
+        history = self.context.build_history(query)
+        self.last_prompt_tokens = self.context.count_tokens(history, query)
+        tool_results = []
+        result = None
+        async for item in self.agent.stream(query, external_history=history):
+            if isinstance(item, tuple):
+                action, observation = item
+                tool_results.append((getattr(action, 'tool', 'tool'), str(observation)))
+            else:
+                result = item
+        self.context.record_turn(query, str(result), tool_results)
+        return result
+
+    def clear_conversation_history(self):
+        self.context.clear()
+
+    def __getattr__(self, name):
+        return getattr(self.agent, name)
@@ -3,10 +3,18 @@
 import json
 import os
 from datetime import datetime, timezone
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 import pytz
 
+# Parsed discovery documents, filled by preload_discovery_document() (the zygote launcher
+# calls it once so forked servers skip reading and parsing the JSON on first use)
+_discovery_documents = {}
+
+def preload_discovery_document(service_name: str, api_version: str):
+    from googleapiclient.discovery_cache import get_static_doc
+    document = get_static_doc(service_name, api_version)
+    if document:
+        _discovery_documents[(service_name, api_version)] = json.loads(document)
+
 class GoogleServiceBase:
     def __init__(self, service_name: str, api_version: str, scopes: list):
         self.service_name = service_name
@@ -17,6 +25,10 @@ class GoogleServiceBase:
         self.user_timezone = None
     
     def authenticate_with_token_data(self, credentials_path: str, token_data: dict):
+        # googleapiclient and google.oauth2 are imported on first use to keep server startup fast
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build, build_from_document
+        
         with open(credentials_path, 'r') as f:
             json.load(f)
         
@@ -29,7 +41,11 @@ class GoogleServiceBase:
             scopes=token_data.get('scopes', self.scopes)
         )
         
-        self.service = build(self.service_name, self.api_version, credentials=self.credentials)
+        document = _discovery_documents.get((self.service_name, self.api_version))
+        if document:
+            self.service = build_from_document(document, credentials=self.credentials)
+        else:
+            self.service = build(self.service_name, self.api_version, credentials=self.credentials)
         self._get_user_timezone()
         return True
     
@@ -64,6 +80,16 @@ def initialize_google_service(service_class, service_name: str, default_scopes:
     
     return service_class.authenticate_with_token_data(credentials_path, token_data)
 
+def cache_invalidated_at(name: str):
+    # Touched by the backend when a push notification reports changes (see push_notifications.invalidate_cache)
+    cache_dir = os.getenv("MCP_CACHE_DIR")
+    if not cache_dir:
+        return 0
+    try:
+        return os.path.getmtime(os.path.join(cache_dir, f"{name}.invalidated"))
+    except OSError:
+        return 0
+
 def get_timezone_info(service_instance):
     current_time = service_instance.get_current_user_time()
     return json.dumps({
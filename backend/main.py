@@ -1,20 +1,34 @@
+import asyncio
 import json
 import os
+import shutil
+import subprocess
+import sys
 import uuid
 import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, BackgroundTasks
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from mcp_use import MCPAgent, MCPClient
 from langchain.chat_models import init_chat_model
+from context_manager import ContextManagedAgent
+from push_notifications import WatchManager, gmail_source_from_env
+from mcp_launcher import LAUNCHER_PATH, private_socket_path, server_command, zygote_supported
 
 load_dotenv()
 
 user_sessions = {}
 agents = {}
 
+# "zygote" forks warm servers from a preloaded process, "direct" starts them with the venv
+# interpreter, "uv" keeps the old `uv run` launch
+MCP_LAUNCH_MODE = os.getenv("MCP_LAUNCH_MODE", "zygote")
+mcp_zygote = None
+mcp_zygote_socket = None
+shared_llm = None
+
 def create_session(user_data, access_token):
     session_id = str(uuid.uuid4())
     user_sessions[session_id] = {
@@ -40,7 +54,7 @@ def delete_session(session_id):
     if session_id and session_id in agents:
         del agents[session_id]
 
-async def authenticate_mcp_servers_for_session(session_id: str, user_email: str, token: str):
+async def authenticate_mcp_servers_for_session(session_id: str, user_email: str, token: str, refresh_token: str = None):
     session_mcp_dir = os.path.expanduser(f"~/.config/mcp-session-{session_id}")
     os.makedirs(session_mcp_dir, exist_ok=True)
     
@@ -85,6 +99,7 @@ async def authenticate_mcp_servers_for_session(session_id: str, user_email: str,
     agent = await initialize_agent_for_session(session_id, credentials_path, token)
     if agent:
         agents[session_id] = agent
+        await watch_manager.register(session_id, user_email, token, refresh_token, session_mcp_dir)
         return True
     return False
 
@@ -103,6 +118,10 @@ When a user asks to add a meeting or create an event, you MUST use the create_ev
 When a user asks to delete a meeting, you MUST use the delete_event tool.
 When a user asks to list meetings, you MUST use the list_events tool.
 
+CALENDARS: Users may have several calendars (team, shared and resource calendars). Use list_calendars to see them. list_events, search_events and get_free_busy accept calendar_ids as "primary", "all", or comma-separated calendar ids or names. When an event comes from another calendar, pass its calendar_id to get_event, update_event and delete_event.
+
+RECURRING EVENTS: list_events lists a recurring event with the other events when it occurs only a few times in the range, and otherwise returns the series once under recurring_series (with its occurrence count and next occurrences) instead of every instance. Pass expand_recurring=true only when individual occurrences are needed. update_event and delete_event take scope="instance" (default, one occurrence), scope="series" (the whole series) or scope="following" (this and following occurrences). Use create_event's recurrence parameter with an RRULE (e.g. "RRULE:FREQ=WEEKLY;BYDAY=MO") to create a recurring event.
+
 ATTENDEES: You can add attendees to calendar events by providing their email addresses separated by commas in the attendees parameter. For example: "john@example.com, jane@example.com"
 
 Always complete the requested action using the appropriate tools."""
@@ -110,53 +129,122 @@ Always complete the requested action using the appropriate tools."""
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        self.session_connections: dict[str, list[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        for session_id, connections in list(self.session_connections.items()):
+            if websocket in connections:
+                connections.remove(websocket)
+            if not connections:
+                del self.session_connections[session_id]
+
+    def subscribe(self, session_id: str, websocket: WebSocket):
+        connections = self.session_connections.setdefault(session_id, [])
+        if websocket not in connections:
+            connections.append(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
+    async def send_to_session(self, session_id: str, payload: dict):
+        for websocket in list(self.session_connections.get(session_id, [])):
+            try:
+                await websocket.send_text(json.dumps(payload))
+            except Exception:
+                self.disconnect(websocket)
+
 manager = ConnectionManager()
+watch_manager = WatchManager(
+    notify=manager.send_to_session,
+    gmail_source=gmail_source_from_env(),
+    webhook_base_url=os.getenv("WEBHOOK_BASE_URL"),
+    session_active=lambda session_id: get_session(session_id) is not None
+)
+
+def mcp_server_config(server: str, env: dict):
+    if MCP_LAUNCH_MODE == "uv":
+        return {"command": "uv", "args": ["run", "python", f"{server}_mcp_server.py"], "env": env}
+    if MCP_LAUNCH_MODE == "direct":
+        return {"command": sys.executable, "args": [f"{server}_mcp_server.py"], "env": env}
+    command, args = server_command(server)
+    # Without a running zygote the stub execs the server directly
+    if mcp_zygote_socket:
+        env = dict(env, MCP_ZYGOTE_SOCKET=mcp_zygote_socket)
+    return {"command": command, "args": args, "env": env}
+
+def get_llm():
+    # One Gemini client for all sessions; MCPAgent binds tools onto it without mutating it
+    global shared_llm
+    if shared_llm is None:
+        shared_llm = init_chat_model("gemini-2.5-flash", model_provider="google_genai")
+    return shared_llm
+
+def start_mcp_zygote():
+    global mcp_zygote_socket
+    if MCP_LAUNCH_MODE != "zygote" or not zygote_supported():
+        return None
+    # A fresh 0700 directory per backend, so the socket path cannot be claimed by another user
+    socket_path = private_socket_path()
+    process = subprocess.Popen([sys.executable, LAUNCHER_PATH, "zygote", socket_path], stdin=subprocess.DEVNULL)
+    # The socket appears once the servers are imported; until then sessions launch directly
+    deadline = time.time() + 60
+    while not os.path.exists(socket_path) and process.poll() is None and time.time() < deadline:
+        time.sleep(0.05)
+    if not os.path.exists(socket_path):
+        print("MCP zygote did not start; launching servers directly")
+        stop_mcp_zygote(process, socket_path)
+        return None
+    mcp_zygote_socket = socket_path
+    return process
+
+def stop_mcp_zygote(process, socket_path: str):
+    global mcp_zygote_socket
+    mcp_zygote_socket = None
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    shutil.rmtree(os.path.dirname(socket_path), ignore_errors=True)
 
 async def initialize_agent_for_session(session_id: str, credentials_path: str, access_token: str):
+    server_env = {
+        "GOOGLE_OAUTH_CREDENTIALS": credentials_path,
+        "GOOGLE_ACCESS_TOKEN": access_token,
+        "MCP_CACHE_DIR": os.path.dirname(credentials_path)
+    }
     config = {
         "mcpServers": {
             "date-time-tools": {
                 "command": "npx",
                 "args": ["-y", "@abhi12299/date-time-tools"]
             },
-            "calendar": {
-                "command": "uv",
-                "args": ["run", "python", "calendar_mcp_server.py"],
-                "env": {
-                    "GOOGLE_OAUTH_CREDENTIALS": credentials_path,
-                    "GOOGLE_ACCESS_TOKEN": access_token
-                }
-            },
-            "gmail": {
-                "command": "uv",
-                "args": ["run", "python", "gmail_mcp_server.py"],
-                "env": {
-                    "GOOGLE_OAUTH_CREDENTIALS": credentials_path,
-                    "GOOGLE_ACCESS_TOKEN": access_token
-                }
-            }
+            "calendar": mcp_server_config("calendar", server_env),
+            "gmail": mcp_server_config("gmail", server_env)
         }
     }
 
     client = MCPClient.from_dict(config)
-    llm = init_chat_model("gemini-2.5-flash", model_provider="google_genai")
-    agent = MCPAgent(llm=llm, client=client, max_steps=90, system_prompt=SYSTEM_PROMPT)
-    return agent
+    # History lives in ContextManagedAgent, which hands the agent a compacted copy each turn
+    agent = MCPAgent(llm=get_llm(), client=client, max_steps=90, system_prompt=SYSTEM_PROMPT, memory_enabled=False)
+    return ContextManagedAgent(agent)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global mcp_zygote
+    mcp_zygote = await asyncio.to_thread(start_mcp_zygote)
+    watch_manager.start()
     yield
+    await watch_manager.stop()
+    if mcp_zygote:
+        stop_mcp_zygote(mcp_zygote, mcp_zygote_socket)
 
 app = FastAPI(title="MCP Chatbot API", version="1.0.0", lifespan=lifespan)
 
@@ -173,54 +261,82 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     session_id = None
     
-    while True:
-        data = await websocket.receive_text()
-        message_data = json.loads(data)
-        
-        if message_data.get("type") == "message":
-            user_message = message_data.get("message", "")
-            session_id = message_data.get("sessionId")
+    try:
+        while True:
+            data = await websocket.receive_text()
+            message_data = json.loads(data)
             
-            if not session_id:
-                await manager.send_personal_message(
-                    json.dumps({"type": "error", "message": "Session ID required. Please authenticate first."}), 
-                    websocket
-                )
-                continue
+            if message_data.get("type") == "subscribe":
+                session_id = message_data.get("sessionId")
+                if session_id and get_session(session_id):
+                    manager.subscribe(session_id, websocket)
             
-            agent = agents.get(session_id)
-            if not agent:
+            elif message_data.get("type") == "message":
+                user_message = message_data.get("message", "")
+                session_id = message_data.get("sessionId")
+                
+                if not session_id:
+                    await manager.send_personal_message(
+                        json.dumps({"type": "error", "message": "Session ID required. Please authenticate first."}), 
+                        websocket
+                    )
+                    continue
+                
+                agent = agents.get(session_id)
+                if not agent:
+                    await manager.send_personal_message(
+                        json.dumps({"type": "error", "message": "Agent not initialized for your session. Please re-authenticate."}), 
+                        websocket
+                    )
+                    continue
+                
+                manager.subscribe(session_id, websocket)
                 await manager.send_personal_message(
-                    json.dumps({"type": "error", "message": "Agent not initialized for your session. Please re-authenticate."}), 
+                    json.dumps({"type": "typing", "message": "Agent is thinking..."}), 
                     websocket
                 )
-                continue
-            
-            await manager.send_personal_message(
-                json.dumps({"type": "typing", "message": "Agent is thinking..."}), 
-                websocket
-            )
+                
+                try:
+                    print(f"Running agent with message: {user_message}")
+                    result = await agent.run(user_message)
+                    print(f"Agent result: {str(result)}")
+                    await manager.send_personal_message(
+                        json.dumps({"type": "response", "message": str(result)}), 
+                        websocket
+                    )
+                except Exception as e:
+                    print(f"Agent error: {str(e)}")
+                    await manager.send_personal_message(
+                        json.dumps({"type": "error", "message": f"Agent error: {str(e)}"}), 
+                        websocket
+                    )
             
-            try:
-                print(f"Running agent with message: {user_message}")
-                result = await agent.run(user_message)
-                print(f"Agent result: {str(result)}")
+            elif message_data.get("type") == "ping":
                 await manager.send_personal_message(
-                    json.dumps({"type": "response", "message": str(result)}), 
+                    json.dumps({"type": "pong"}), 
                     websocket
                 )
-            except Exception as e:
-                print(f"Agent error: {str(e)}")
-                await manager.send_personal_message(
-                    json.dumps({"type": "error", "message": f"Agent error: {str(e)}"}), 
-                    websocket
-                )
-        
-        elif message_data.get("type") == "ping":
-            await manager.send_personal_message(
-                json.dumps({"type": "pong"}), 
-                websocket
-            )
+    except WebSocketDisconnect:
+        manager.disconnect(websocket)
+
+@app.post("/webhooks/calendar")
+async def calendar_webhook(request: Request, background_tasks: BackgroundTasks):
+    if not watch_manager.verify_calendar_push(request.headers):
+        raise HTTPException(status_code=403, detail="Unknown channel or invalid channel token")
+    # Acknowledge right away; Google retries pushes that are slow to answer
+    background_tasks.add_task(watch_manager.handle_calendar_push, dict(request.headers))
+    return {"success": True}
+
+@app.post("/webhooks/gmail")
+async def gmail_webhook(request: Request, background_tasks: BackgroundTasks, token: str = None):
+    expected_token = os.getenv("GMAIL_PUSH_VERIFICATION_TOKEN")
+    if expected_token and token != expected_token:
+        raise HTTPException(status_code=403, detail="Invalid verification token")
+    envelope = await request.json()
+    if not envelope.get("message", {}).get("data"):
+        raise HTTPException(status_code=400, detail="Pub/Sub message data missing")
+    background_tasks.add_task(watch_manager.handle_gmail_push, envelope)
+    return {"success": True}
 
 @app.get("/auth/google/callback")
 async def google_callback(code: str = None, state: str = None):
@@ -243,6 +359,7 @@ async def google_callback(code: str = None, state: str = None):
     if response.status_code == 200:
         token_info = response.json()
         access_token = token_info.get('access_token')
+        refresh_token = token_info.get('refresh_token')
 
         user_url = "https://www.googleapis.com/oauth2/v2/userinfo"
         headers = {"Authorization": f"Bearer {access_token}"}
@@ -256,7 +373,7 @@ async def google_callback(code: str = None, state: str = None):
                 user_email = f"user_{user_data.get('id', 'unknown')}@gmail.com"
             
             session_id = create_session(user_data, access_token)
-            await authenticate_mcp_servers_for_session(session_id, user_email, access_token)
+            await authenticate_mcp_servers_for_session(session_id, user_email, access_token, refresh_token)
             
             return HTMLResponse(f"""
             <html>
@@ -278,7 +395,7 @@ async def google_callback(code: str = None, state: str = None):
             user_data = {"email": user_email, "id": "unknown", "name": "User"}
             
             session_id = create_session(user_data, access_token)
-            await authenticate_mcp_servers_for_session(session_id, user_email, access_token)
+            await authenticate_mcp_servers_for_session(session_id, user_email, access_token, refresh_token)
             
             return HTMLResponse(f"""
             <html>
@@ -315,6 +432,7 @@ async def get_auth_status(session_id: str = None):
 @app.post("/auth/logout")
 async def logout(session_id: str = None):
     if session_id:
+        await watch_manager.unregister(session_id)
         delete_session(session_id)
     return {"success": True, "message": "Logged out successfully"}
     
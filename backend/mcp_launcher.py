@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# Starts MCP servers without paying interpreter + import cost per session.
+#
+#   python mcp_launcher.py zygote SOCKET     preload the servers and wait for connections
+#   python mcp_launcher.py connect calendar  serve MCP over this process's stdio
+#
+# "connect" is a tiny stub: it hands its stdin/stdout/stderr and environment (which holds the
+# user's OAuth token) to the zygote over the Unix socket named by MCP_ZYGOTE_SOCKET, the zygote
+# forks an already-imported server onto them, and the stub just relays signals and the exit
+# code. The socket lives in a private 0700 directory and both ends check the peer's uid.
+# Without a zygote it execs the server directly.
+
+import json
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import time
+import traceback
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+LAUNCHER_PATH = os.path.abspath(__file__)
+SERVERS = {
+    "calendar": ("calendar_mcp_server", "calendar", "v3", "get_calendar_timezone_info"),
+    "gmail": ("gmail_mcp_server", "gmail", "v1", "get_gmail_timezone_info"),
+}
+PROBE_TIMEOUT = float(os.getenv("MCP_ZYGOTE_PROBE_TIMEOUT", 20))
+
+def zygote_supported():
+    return hasattr(os, 'fork') and hasattr(socket, 'send_fds')
+
+def private_socket_path():
+    # mkdtemp creates the directory 0700, so no other user can bind or connect inside it
+    directory = tempfile.mkdtemp(prefix="mcp-zygote-", dir=os.getenv("XDG_RUNTIME_DIR") or None)
+    return os.path.join(directory, "zygote.sock")
+
+def _check_private_dir(socket_path: str):
+    info = os.stat(os.path.dirname(os.path.abspath(socket_path)))
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"zygote socket directory must be private to this user: {os.path.dirname(socket_path)}")
+
+def _check_peer(conn):
+    # The peer must run as this user; platforms without SO_PEERCRED rely on the private directory
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return
+    _, uid, _ = struct.unpack('3i', conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+    if uid != os.getuid():
+        raise PermissionError(f"zygote peer runs as uid {uid}")
+
+def server_command(server: str):
+    # The venv interpreter running the backend, so no `uv run` environment resolution per session;
+    # -S skips site-packages setup, which the stdlib-only stub does not need
+    return sys.executable, ["-S", LAUNCHER_PATH, "connect", server]
+
+def _recv_exact(conn, size: int, data: bytes = b''):
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("launcher connection closed")
+        data += chunk
+    return data
+
+def _rpc(stream, message: dict):
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+def _lines(fd: int, deadline: float):
+    # Yields newline-terminated lines from fd, raising TimeoutError once the deadline passes
+    pending = b''
+    while True:
+        while b'\n' not in pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("probe timed out")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("probe closed its output")
+            pending += chunk
+        line, pending = pending.split(b'\n', 1)
+        yield line
+
+def _probe_lazy_imports(server: str, module):
+    # Runs the server once in a throwaway child and reports the modules its first requests
+    # import lazily. The zygote imports them itself but never runs an event loop, so it stays
+    # free of threads and safe to fork. A probe that hangs is killed and its server is
+    # forked without the extra preloading.
+    stdin_r, stdin_w = os.pipe()
+    stdout_r, stdout_w = os.pipe()
+    report_r, report_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.dup2(stdin_r, 0)
+            os.dup2(stdout_w, 1)
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, 2)
+            for fd in (stdin_r, stdin_w, stdout_r, stdout_w, report_r, devnull):
+                os.close(fd)
+            before = set(sys.modules)
+            module.mcp.run(show_banner=False)
+            with os.fdopen(report_w, 'w') as report:
+                report.write(json.dumps(sorted(set(sys.modules) - before)) + "\n")
+        finally:
+            os._exit(0)
+
+    for fd in (stdin_r, stdout_w, report_w):
+        os.close(fd)
+    deadline = time.monotonic() + PROBE_TIMEOUT
+    names = []
+    try:
+        with os.fdopen(stdin_w, 'w') as requests:
+            responses = _lines(stdout_r, deadline)
+            _rpc(requests, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "mcp-zygote", "version": "1.0"}
+            }})
+            next(responses)
+            _rpc(requests, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+            _rpc(requests, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+            next(responses)
+            _rpc(requests, {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": SERVERS[server][3], "arguments": {}}})
+            next(responses)
+        names = json.loads(next(_lines(report_r, deadline)))
+    except (TimeoutError, EOFError, OSError, ValueError) as e:
+        if isinstance(e, TimeoutError):
+            print(f"Zygote probe for {server} timed out after {PROBE_TIMEOUT:.0f}s; skipping preload", file=sys.stderr, flush=True)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    finally:
+        os.close(stdout_r)
+        os.close(report_r)
+    os.waitpid(pid, 0)
+    return names
+
+def _preload():
+    import importlib
+    sys.path.insert(0, BACKEND_DIR)
+    from google_service_utils import preload_discovery_document
+    import google.oauth2.credentials
+    import googleapiclient.discovery
+    modules = {}
+    for server, (module_name, service_name, api_version, _) in SERVERS.items():
+        modules[server] = importlib.import_module(module_name)
+        preload_discovery_document(service_name, api_version)
+    for server, module in modules.items():
+        for name in _probe_lazy_imports(server, module):
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+    return modules
+
+def _run_child(conn, fds: list, request: dict, modules: dict):
+    for target, fd in zip((0, 1, 2), fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.environ.clear()
+    os.environ.update(request.get('env', {}))
+    os.chdir(request.get('cwd') or BACKEND_DIR)
+    conn.sendall(json.dumps({"pid": os.getpid()}).encode('utf-8') + b'\n')
+
+    code = 0
+    try:
+        modules[request['server']].mcp.run(show_banner=False)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+        conn.sendall(json.dumps({"exit": code}).encode('utf-8') + b'\n')
+    finally:
+        os._exit(code)
+
+def run_zygote(socket_path: str):
+    _check_private_dir(socket_path)
+    modules = _preload()
+    # Forked servers are never waited on by the zygote
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Created 0600 by bind itself, so there is no window before a chmod
+    umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(umask)
+    listener.listen(64)
+    print(f"MCP zygote ready on {socket_path}", file=sys.stderr, flush=True)
+
+    while True:
+        conn, _ = listener.accept()
+        fds = []
+        try:
+            _check_peer(conn)
+            header, fds, _, _ = socket.recv_fds(conn, 4, 3)
+            header = _recv_exact(conn, 4, header)
+            (size,) = struct.unpack('!I', header)
+            request = json.loads(_recv_exact(conn, size))
+            if request.get('server') not in modules or len(fds) != 3:
+                raise ValueError(f"bad launch request for {request.get('server')}")
+        except Exception as e:
+            print(f"Zygote rejected connection: {str(e)}", file=sys.stderr, flush=True)
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            continue
+
+        if os.fork() == 0:
+            listener.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            _run_child(conn, fds, request, modules)
+        for fd in fds:
+            os.close(fd)
+        conn.close()
+
+def run_connect(server: str, socket_path: str = None):
+    socket_path = socket_path or os.getenv("MCP_ZYGOTE_SOCKET")
+    client = None
+    try:
+        if not zygote_supported() or not socket_path:
+            raise OSError("no zygote available")
+        # Check who is listening before handing over stdio and the environment
+        _check_private_dir(socket_path)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_path)
+        _check_peer(client)
+    except OSError:
+        if client:
+            client.close()
+        script = os.path.join(BACKEND_DIR, f"{SERVERS[server][0]}.py")
+        os.execv(sys.executable, [sys.executable, script])
+
+    payload = json.dumps({"server": server, "env": dict(os.environ), "cwd": os.getcwd()}).encode('utf-8')
+    socket.send_fds(client, [struct.pack('!I', len(payload))], [0, 1, 2])
+    client.sendall(payload)
+
+    reader = client.makefile('r')
+    hello = reader.readline()
+    if not hello:
+        sys.exit(1)
+    child_pid = json.loads(hello)['pid']
+
+    def forward(signum, frame):
+        try:
+            os.kill(child_pid, signum)
+        except ProcessLookupError:
+            pass
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    status = reader.readline()
+    sys.exit(json.loads(status)['exit'] if status else 1)
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "zygote":
+        run_zygote(sys.argv[2] if len(sys.argv) > 2 else os.getenv("MCP_ZYGOTE_SOCKET") or private_socket_path())
+    elif len(sys.argv) >= 3 and sys.argv[1] == "connect" and sys.argv[2] in SERVERS:
+        run_connect(sys.argv[2])
+    else:
+        print(f"usage: {sys.argv[0]} zygote [socket] | connect {{{','.join(SERVERS)}}}", file=sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+
+import asyncio
+import base64
+import json
+import os
+import secrets
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import quote
+import requests as http_requests
+
+CALENDAR_API = "https://www.googleapis.com/calendar/v3"
+GMAIL_API = "https://gmail.googleapis.com/gmail/v1/users/me"
+TOKEN_URL = "https://oauth2.googleapis.com/token"
+
+RENEW_CHECK_INTERVAL = int(os.getenv("WATCH_RENEW_CHECK_INTERVAL", 300))
+RENEW_MARGIN = int(os.getenv("WATCH_RENEW_MARGIN", 3600))
+CALENDAR_CHANNEL_TTL = int(os.getenv("CALENDAR_CHANNEL_TTL", 86400))
+MAX_NOTIFIED_ITEMS = 5
+
+def invalidate_cache(cache_dir: str, name: str):
+    # MCP servers compare this marker's mtime against their last sync (see cache_invalidated_at)
+    if not cache_dir:
+        return
+    path = os.path.join(cache_dir, f"{name}.invalidated")
+    with open(path, 'a'):
+        pass
+    os.utime(path, None)
+
+def make_pubsub_envelope(email: str, history_id):
+    data = json.dumps({"emailAddress": email, "historyId": history_id}).encode('utf-8')
+    return {
+        "message": {
+            "data": base64.b64encode(data).decode('utf-8'),
+            "messageId": str(uuid.uuid4()),
+            "publishTime": datetime.now(timezone.utc).isoformat()
+        },
+        "subscription": "local"
+    }
+
+def _google_request(session: dict, method: str, url: str, **kwargs):
+    response = http_requests.request(method, url, headers={"Authorization": f"Bearer {session['access_token']}"}, timeout=10, **kwargs)
+    if response.status_code == 401 and session.get('refresh_token'):
+        refreshed = http_requests.post(TOKEN_URL, data={
+            "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+            "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
+            "refresh_token": session['refresh_token'],
+            "grant_type": "refresh_token"
+        }, timeout=10)
+        if refreshed.status_code == 200:
+            session['access_token'] = refreshed.json()['access_token']
+            response = http_requests.request(method, url, headers={"Authorization": f"Bearer {session['access_token']}"}, timeout=10, **kwargs)
+    response.raise_for_status()
+    return response.json() if response.content else {}
+
+def _calendar_ids(session: dict):
+    calendar_ids = []
+    params = {}
+    while True:
+        result = _google_request(session, "GET", f"{CALENDAR_API}/users/me/calendarList", params=params)
+        calendar_ids.extend(cal['id'] for cal in result.get('items', []))
+        if not result.get('nextPageToken'):
+            return calendar_ids
+        params['pageToken'] = result['nextPageToken']
+
+def _header(headers: list, name: str, default: str = ''):
+    return next((h['value'] for h in headers if h['name'] == name), default)
+
+class PubSubGmailSource:
+    def __init__(self, topic: str):
+        self.topic = topic
+
+    def watch(self, session: dict):
+        return _google_request(session, "POST", f"{GMAIL_API}/watch", json={
+            "topicName": self.topic,
+            "labelIds": ["INBOX"],
+            "labelFilterBehavior": "include"
+        })
+
+    def stop(self, session: dict):
+        _google_request(session, "POST", f"{GMAIL_API}/stop")
+
+    def new_messages(self, session: dict, start_history_id: str):
+        history = _google_request(session, "GET", f"{GMAIL_API}/history", params={
+            "startHistoryId": start_history_id,
+            "historyTypes": "messageAdded",
+            "labelId": "INBOX"
+        })
+        message_ids = []
+        for record in history.get('history', []):
+            for added in record.get('messagesAdded', []):
+                if added['message']['id'] not in message_ids:
+                    message_ids.append(added['message']['id'])
+        messages = []
+        for message_id in message_ids[:MAX_NOTIFIED_ITEMS]:
+            msg = _google_request(session, "GET", f"{GMAIL_API}/messages/{message_id}", params={
+                "format": "metadata",
+                "metadataHeaders": ["From", "Subject"]
+            })
+            headers = msg.get('payload', {}).get('headers', [])
+            messages.append({
+                'id': message_id,
+                'sender': _header(headers, 'From', 'Unknown Sender'),
+                'subject': _header(headers, 'Subject', 'No Subject'),
+                'snippet': msg.get('snippet', '')
+            })
+        return messages, history.get('historyId', start_history_id)
+
+class LocalGmailSource:
+    # Stand-in for users.watch + Pub/Sub: publish() feeds an envelope through the same
+    # handler the /webhooks/gmail endpoint uses, without touching Google
+    def __init__(self):
+        self.manager = None
+        self._pending = {}
+
+    def watch(self, session: dict):
+        return {"historyId": "0", "expiration": str(int((time.time() + 7 * 86400) * 1000))}
+
+    def stop(self, session: dict):
+        pass
+
+    def new_messages(self, session: dict, start_history_id: str):
+        history_id, messages = self._pending.pop(session['email'].lower(), (start_history_id, []))
+        return messages, history_id
+
+    async def publish(self, email: str, history_id, messages: list = None):
+        self._pending[email.lower()] = (str(history_id), list(messages or []))
+        return await self.manager.handle_gmail_push(make_pubsub_envelope(email, history_id))
+
+def gmail_source_from_env():
+    mode = os.getenv("GMAIL_PUSH_MODE", "pubsub" if os.getenv("GMAIL_PUBSUB_TOPIC") else "")
+    if mode == "local":
+        return LocalGmailSource()
+    if mode == "pubsub" and os.getenv("GMAIL_PUBSUB_TOPIC"):
+        return PubSubGmailSource(os.getenv("GMAIL_PUBSUB_TOPIC"))
+    return None
+
+class WatchManager:
+    def __init__(self, notify, gmail_source=None, webhook_base_url: str = None, session_active=None):
+        self.notify = notify
+        self.gmail_source = gmail_source
+        if isinstance(gmail_source, LocalGmailSource):
+            gmail_source.manager = self
+        self.webhook_base_url = webhook_base_url.rstrip('/') if webhook_base_url else None
+        self.session_active = session_active or (lambda session_id: True)
+        self.sessions = {}
+        self.channels = {}
+        self.gmail_watches = {}
+        self._setup_tasks = {}
+        self._renew_task = None
+
+    async def register(self, session_id: str, email: str, access_token: str, refresh_token: str = None, cache_dir: str = None):
+        self.sessions[session_id] = {
+            'email': email,
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'cache_dir': cache_dir,
+            'unwatchable': set()
+        }
+        # Opening the watches takes a round trip per calendar; keep it off the login path
+        self._setup_tasks[session_id] = asyncio.create_task(self._open_watches(session_id))
+
+    async def _open_watches(self, session_id: str):
+        async def watch_calendar_list():
+            try:
+                await self._watch_calendar(session_id, 'calendarList')
+            except Exception as e:
+                print(f"Calendar watch failed for calendarList: {str(e)}")
+
+        async def watch_gmail():
+            try:
+                await self._watch_gmail(session_id)
+            except Exception as e:
+                print(f"Gmail watch failed: {str(e)}")
+
+        setup = []
+        if self.webhook_base_url:
+            setup += [watch_calendar_list(), self._sync_calendar_watches(session_id)]
+        if self.gmail_source:
+            setup.append(watch_gmail())
+        await asyncio.gather(*setup)
+
+    async def wait_until_watching(self, session_id: str):
+        task = self._setup_tasks.get(session_id)
+        if task:
+            await asyncio.shield(task)
+
+    async def unregister(self, session_id: str):
+        # Let an in-flight setup finish so every channel it opens is stopped below
+        try:
+            await self.wait_until_watching(session_id)
+        except Exception as e:
+            print(f"Watch setup failed: {str(e)}")
+        self._setup_tasks.pop(session_id, None)
+        session = self.sessions.pop(session_id, None)
+        if not session:
+            return
+        for channel_id, channel in list(self.channels.items()):
+            if channel['session_id'] == session_id:
+                del self.channels[channel_id]
+                await self._stop_calendar_channel(session, channel_id, channel)
+        if self.gmail_watches.pop(session_id, None) and self.gmail_source:
+            try:
+                await asyncio.to_thread(self.gmail_source.stop, session)
+            except Exception as e:
+                print(f"Gmail watch stop failed: {str(e)}")
+
+    async def _watch_calendar(self, session_id: str, resource: str, calendar_id: str = None, checked_at: float = None):
+        session = self.sessions[session_id]
+        channel_id = str(uuid.uuid4())
+        token = secrets.token_urlsafe(24)
+        if resource == 'events':
+            url = f"{CALENDAR_API}/calendars/{quote(calendar_id, safe='')}/events/watch"
+        else:
+            url = f"{CALENDAR_API}/users/me/calendarList/watch"
+        result = await asyncio.to_thread(_google_request, session, "POST", url, json={
+            "id": channel_id,
+            "type": "web_hook",
+            "address": f"{self.webhook_base_url}/webhooks/calendar",
+            "token": token,
+            "params": {"ttl": str(CALENDAR_CHANNEL_TTL)}
+        })
+        self.channels[channel_id] = {
+            'session_id': session_id,
+            'resource': resource,
+            'calendar_id': calendar_id,
+            'resource_id': result.get('resourceId'),
+            'token': token,
+            'expiration': int(result.get('expiration', 0)) / 1000,
+            'checked_at': checked_at or time.time()
+        }
+
+    async def _sync_calendar_watches(self, session_id: str):
+        # One events channel per calendar in the session's calendar list, so team and
+        # shared calendars are pushed like the primary one
+        session = self.sessions[session_id]
+        try:
+            calendar_ids = set(await asyncio.to_thread(_calendar_ids, session))
+        except Exception as e:
+            print(f"Calendar list lookup failed: {str(e)}")
+            return
+        watched = {
+            channel['calendar_id']: channel_id for channel_id, channel in self.channels.items()
+            if channel['session_id'] == session_id and channel['resource'] == 'events'
+        }
+        new_ids = sorted(calendar_ids - set(watched) - session['unwatchable'])
+        results = await asyncio.gather(*(self._watch_calendar(session_id, 'events', calendar_id) for calendar_id in new_ids),
+                                       return_exceptions=True)
+        for calendar_id, result in zip(new_ids, results):
+            if isinstance(result, Exception):
+                # Some calendars (e.g. holidays) do not support push; they stay on the sync TTL
+                # and are not retried on every calendar list change
+                session['unwatchable'].add(calendar_id)
+                print(f"Calendar watch failed for {calendar_id}: {str(result)}")
+        for calendar_id in set(watched) - calendar_ids:
+            channel_id = watched[calendar_id]
+            await self._stop_calendar_channel(session, channel_id, self.channels.pop(channel_id))
+
+    async def _stop_calendar_channel(self, session: dict, channel_id: str, channel: dict):
+        try:
+            await asyncio.to_thread(_google_request, session, "POST", f"{CALENDAR_API}/channels/stop", json={
+                "id": channel_id,
+                "resourceId": channel['resource_id']
+            })
+        except Exception as e:
+            print(f"Calendar channel stop failed: {str(e)}")
+
+    async def _watch_gmail(self, session_id: str):
+        result = await asyncio.to_thread(self.gmail_source.watch, self.sessions[session_id])
+        previous = self.gmail_watches.get(session_id, {})
+        self.gmail_watches[session_id] = {
+            # Keep the older cursor on renewal so nothing between the two watches is skipped
+            'history_id': previous.get('history_id') or result.get('historyId'),
+            'expiration': int(result.get('expiration', 0)) / 1000
+        }
+
+    def verify_calendar_push(self, headers) -> bool:
+        channel = self.channels.get(headers.get('x-goog-channel-id', ''))
+        return bool(channel) and secrets.compare_digest(channel['token'], headers.get('x-goog-channel-token', ''))
+
+    async def handle_calendar_push(self, headers):
+        channel = self.channels.get(headers.get('x-goog-channel-id', ''))
+        if not channel or headers.get('x-goog-resource-state') == 'sync':
+            return
+        session = self.sessions.get(channel['session_id'])
+        if not session:
+            return
+        invalidate_cache(session['cache_dir'], 'calendar')
+
+        if channel['resource'] == 'calendarList':
+            await self._sync_calendar_watches(channel['session_id'])
+            await self.notify(channel['session_id'], {
+                "type": "notification",
+                "source": "calendar",
+                "message": "Your calendar list changed."
+            })
+            return
+
+        since = datetime.fromtimestamp(channel['checked_at'], timezone.utc).isoformat()
+        checked_at = time.time()
+        try:
+            url = f"{CALENDAR_API}/calendars/{quote(channel['calendar_id'], safe='')}/events"
+            result = await asyncio.to_thread(_google_request, session, "GET", url, params={
+                "updatedMin": since,
+                "showDeleted": "true",
+                "maxResults": 50
+            })
+        except Exception as e:
+            print(f"Calendar change lookup failed: {str(e)}")
+            return
+        # Only move the cursor once the lookup succeeded, so a failed one is retried next push
+        channel['checked_at'] = checked_at
+        changes = [{
+            'id': event['id'],
+            'calendar_id': channel['calendar_id'],
+            'summary': event.get('summary', 'No Title'),
+            'status': event.get('status', ''),
+            'start': event.get('start', {}).get('dateTime', event.get('start', {}).get('date', ''))
+        } for event in result.get('items', [])][:MAX_NOTIFIED_ITEMS]
+        if not changes:
+            return
+        lines = [f"'{c['summary']}' was {'cancelled' if c['status'] == 'cancelled' else 'updated'}" for c in changes]
+        await self.notify(channel['session_id'], {
+            "type": "notification",
+            "source": "calendar",
+            "message": "Calendar changed: " + "; ".join(lines),
+            "changes": changes
+        })
+
+    async def handle_gmail_push(self, envelope: dict):
+        data = json.loads(base64.b64decode(envelope['message']['data']).decode('utf-8'))
+        email = data.get('emailAddress', '').lower()
+        for session_id, session in list(self.sessions.items()):
+            watch = self.gmail_watches.get(session_id)
+            if not watch or session['email'].lower() != email:
+                continue
+            try:
+                messages, history_id = await asyncio.to_thread(
+                    self.gmail_source.new_messages, session, watch['history_id'] or str(data.get('historyId')))
+            except Exception as e:
+                print(f"Gmail history lookup failed: {str(e)}")
+                continue
+            watch['history_id'] = str(history_id)
+            if not messages:
+                continue
+            lines = [f"{m['sender']}: {m['subject']}" for m in messages]
+            await self.notify(session_id, {
+                "type": "notification",
+                "source": "gmail",
+                "message": "New email — " + "; ".join(lines),
+                "emails": messages
+            })
+
+    async def renew_expiring(self):
+        deadline = time.time() + RENEW_MARGIN
+        for session_id in list(self.sessions):
+            if not self.session_active(session_id):
+                await self.unregister(session_id)
+        for channel_id, channel in list(self.channels.items()):
+            if channel['expiration'] > deadline or channel['session_id'] not in self.sessions:
+                continue
+            # Open the replacement first so no change falls between the two channels
+            try:
+                await self._watch_calendar(channel['session_id'], channel['resource'], channel['calendar_id'], channel['checked_at'])
+            except Exception as e:
+                print(f"Calendar channel renewal failed: {str(e)}")
+                continue
+            del self.channels[channel_id]
+            await self._stop_calendar_channel(self.sessions[channel['session_id']], channel_id, channel)
+        for session_id, watch in list(self.gmail_watches.items()):
+            if watch['expiration'] <= deadline and session_id in self.sessions:
+                try:
+                    await self._watch_gmail(session_id)
+                except Exception as e:
+                    print(f"Gmail watch renewal failed: {str(e)}")
+
+    async def _renew_loop(self):
+        while True:
+            await asyncio.sleep(RENEW_CHECK_INTERVAL)
+            try:
+                await self.renew_expiring()
+            except Exception as e:
+                print(f"Watch renewal error: {str(e)}")
+
+    def start(self):
+        if not self._renew_task:
+            self._renew_task = asyncio.create_task(self._renew_loop())
+
+    async def stop(self):
+        if self._renew_task:
+            self._renew_task.cancel()
+            self._renew_task = None
+        for session_id in list(self.sessions):
+            await self.unregister(session_id)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+import copy
+import heapq
+import re
+from datetime import datetime, timedelta
+from operator import itemgetter
+from zoneinfo import ZoneInfo
+from dateutil.rrule import rrulestr, rruleset
+import pytz
+
+ICAL_DATETIME = '%Y%m%dT%H%M%S'
+ICAL_DATE = '%Y%m%d'
+UNTIL_RE = re.compile(r'UNTIL=([0-9TZ]+)')
+COUNT_RE = re.compile(r'COUNT=(\d+)')
+
+def _to_naive_local(value: datetime, tz):
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(tz).replace(tzinfo=None)
+
+def _parse_ical_value(value: str, tz, value_tz=None):
+    value = value.strip()
+    if len(value) == 8:
+        return datetime.strptime(value, ICAL_DATE)
+    if value.endswith('Z'):
+        return _to_naive_local(pytz.utc.localize(datetime.strptime(value[:-1], ICAL_DATETIME)), tz)
+    parsed = datetime.strptime(value, ICAL_DATETIME)
+    if value_tz is not None and value_tz.zone != tz.zone:
+        return _to_naive_local(value_tz.localize(parsed), tz)
+    return parsed
+
+def parse_google_time(value: dict, tz):
+    # Returns (naive wall-clock time in tz, is_all_day)
+    if 'date' in value:
+        return datetime.strptime(value['date'], '%Y-%m-%d'), True
+    return _to_naive_local(datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00')), tz), False
+
+class RecurringSeries:
+    def __init__(self, master: dict, default_tz, exceptions: list = None):
+        self.master = master
+        self.id = master['id']
+        self.tz = pytz.timezone(master['start'].get('timeZone')) if master['start'].get('timeZone') else default_tz
+        # pytz.localize() is far too slow per occurrence; zoneinfo attaches offsets in O(1)
+        self._zone = ZoneInfo(self.tz.zone)
+        self.start, self.all_day = parse_google_time(master['start'], self.tz)
+        end, _ = parse_google_time(master['end'], self.tz)
+        self.duration = end - self.start
+        self.rules = self._build_rules(master.get('recurrence', []))
+
+        # Modified and cancelled instances, keyed by the occurrence they replace
+        self.exceptions = {}
+        for event in exceptions or []:
+            original, _ = parse_google_time(event['originalStartTime'], self.tz)
+            self.exceptions[original] = event
+
+    def _build_rules(self, recurrence: list):
+        # Expand in naive wall-clock time and localize afterwards so DST shifts keep the local hour
+        rules = rruleset(cache=True)
+        rules.rdate(self.start)
+        for line in recurrence:
+            name, _, values = line.partition(':')
+            params = name.split(';')
+            value_tz = next((pytz.timezone(p[5:]) for p in params[1:] if p.startswith('TZID=')), None)
+            if params[0] == 'RRULE':
+                rules.rrule(self._rrule(values))
+            elif params[0] in ('EXDATE', 'RDATE'):
+                for value in values.split(','):
+                    parsed = _parse_ical_value(value, self.tz, value_tz)
+                    (rules.exdate if params[0] == 'EXDATE' else rules.rdate)(parsed)
+        return rules
+
+    def _rrule(self, values: str):
+        values = UNTIL_RE.sub(lambda m: 'UNTIL=' + _parse_ical_value(m.group(1), self.tz).strftime(
+            ICAL_DATE if self.all_day else ICAL_DATETIME), values)
+        return rrulestr(values, dtstart=self.start, cache=True)
+
+    def _bound(self, value: datetime):
+        if value is None:
+            return None
+        return _to_naive_local(value, self.tz)
+
+    def occurrences(self, window_start: datetime = None, window_end: datetime = None):
+        # Lazily yields naive occurrence starts overlapping [window_start, window_end)
+        start = self._bound(window_start)
+        end = self._bound(window_end)
+        iterator = iter(self.rules) if start is None else self.rules.xafter(start - self.duration, inc=False)
+        for occurrence in iterator:
+            if end is not None and occurrence >= end:
+                return
+            yield occurrence
+
+    def _google_time(self, naive: datetime):
+        if self.all_day:
+            return {'date': naive.strftime('%Y-%m-%d')}
+        return {'dateTime': naive.replace(tzinfo=self._zone).isoformat(), 'timeZone': self.tz.zone}
+
+    def instance_id(self, original: datetime):
+        if self.all_day:
+            return f"{self.id}_{original.strftime(ICAL_DATE)}"
+        return f"{self.id}_{original.replace(tzinfo=self._zone).astimezone(pytz.utc).strftime(ICAL_DATETIME)}Z"
+
+    def make_instance(self, original: datetime):
+        instance = {k: v for k, v in self.master.items() if k not in ('recurrence', 'id', 'etag', 'start', 'end')}
+        start = self._google_time(original)
+        instance.update({
+            'id': self.instance_id(original),
+            'recurringEventId': self.id,
+            'originalStartTime': start,
+            'start': dict(start),
+            'end': self._google_time(original + self.duration),
+        })
+        return instance
+
+    def _moved_in_window(self, window_start: datetime = None, window_end: datetime = None):
+        # Modified occurrences that land in the window, as (naive start, event) pairs
+        start, end = self._bound(window_start), self._bound(window_end)
+        moved = []
+        for event in self.exceptions.values():
+            if event.get('status') == 'cancelled':
+                continue
+            event_start, _ = parse_google_time(event['start'], self.tz)
+            event_end, _ = parse_google_time(event['end'], self.tz)
+            if (end is None or event_start < end) and (start is None or event_end > start):
+                moved.append((event_start, event))
+        moved.sort(key=itemgetter(0))
+        return moved
+
+    def _starts(self, window_start: datetime = None, window_end: datetime = None):
+        generated = (
+            (original, None)
+            for original in self.occurrences(window_start, window_end)
+            if original not in self.exceptions
+        )
+        return heapq.merge(generated, self._moved_in_window(window_start, window_end), key=itemgetter(0))
+
+    def instances(self, window_start: datetime = None, window_end: datetime = None):
+        for original, event in self._starts(window_start, window_end):
+            yield event if event is not None else self.make_instance(original)
+
+    def summarize(self, window_start: datetime = None, window_end: datetime = None, preview: int = 3):
+        # Counts occurrences without materializing an event dict for each one
+        upcoming = []
+        count = 0
+        modified = 0
+        for start, event in self._starts(window_start, window_end):
+            count += 1
+            if event is not None:
+                modified += 1
+            if len(upcoming) < preview:
+                upcoming.append(self._google_time(start).get('dateTime', start.strftime('%Y-%m-%d')))
+        if not count:
+            return None
+        return {
+            'series_id': self.id,
+            'summary': self.master.get('summary', 'No Title'),
+            'recurrence': self.master.get('recurrence', []),
+            'duration_minutes': int(self.duration.total_seconds() // 60),
+            'location': self.master.get('location', ''),
+            'occurrences_in_window': count,
+            'modified_in_window': modified,
+            'next_occurrences': upcoming
+        }
+
+    def occurrences_before(self, values: str, original: datetime):
+        # COUNT counts what the RRULE generates before EXDATE removes anything, so walk the
+        # bare rule rather than the rule set
+        count = 0
+        for occurrence in self._rrule(values):
+            if occurrence >= original:
+                break
+            count += 1
+        return count
+
+    def split_recurrence(self, original_start: dict):
+        # Splits the rules at an occurrence: the master keeps everything before it,
+        # a new series takes it and everything after it
+        original, _ = parse_google_time(original_start, self.tz)
+        if self.all_day:
+            until = (original - timedelta(days=1)).strftime(ICAL_DATE)
+        else:
+            until = self.tz.localize(original - timedelta(seconds=1)).astimezone(pytz.utc).strftime(ICAL_DATETIME) + 'Z'
+
+        head, tail = [], []
+        for line in self.master.get('recurrence', []):
+            if not line.startswith('RRULE'):
+                head.append(line)
+                tail.append(line)
+                continue
+            name, _, values = line.partition(':')
+            parts = [p for p in values.split(';') if not p.startswith(('UNTIL=', 'COUNT='))]
+            head.append(f"{name}:{';'.join(parts + ['UNTIL=' + until])}")
+            count = COUNT_RE.search(values)
+            if count:
+                before = self.occurrences_before(values, original)
+                tail.append(f"{name}:{COUNT_RE.sub('COUNT=' + str(max(int(count.group(1)) - before, 1)), values)}")
+            else:
+                tail.append(line)
+        return head, tail
+
+    def following_series(self, instance: dict, start_time: datetime = None):
+        # The new series keeps the series' own time, not that of a moved instance,
+        # unless the caller gives a new start
+        _, tail = self.split_recurrence(instance['originalStartTime'])
+        new_series = {k: copy.deepcopy(v) for k, v in self.master.items()
+                      if k in ('summary', 'description', 'location', 'attendees', 'reminders', 'colorId', 'transparency', 'visibility')}
+        start = self._bound(start_time) if start_time else parse_google_time(instance['originalStartTime'], self.tz)[0]
+        new_series['start'] = self._google_time(start)
+        new_series['end'] = self._google_time(start + self.duration)
+        new_series['recurrence'] = tail
+        return new_series
+
+class EventStore:
+    def __init__(self, default_tz):
+        self.default_tz = default_tz
+        self.reset()
+
+    def reset(self):
+        self.singles = {}
+        self.masters = {}
+        self.exceptions = {}
+        self._series = {}
+        self.sync_token = None
+        self.checked_at = 0
+
+    def apply(self, items: list):
+        for event in items:
+            master_id = event.get('recurringEventId')
+            if master_id:
+                self.exceptions.setdefault(master_id, {})[event['id']] = event
+                self._series.pop(master_id, None)
+            elif event.get('status') == 'cancelled':
+                self.singles.pop(event['id'], None)
+                self.masters.pop(event['id'], None)
+                self.exceptions.pop(event['id'], None)
+                self._series.pop(event['id'], None)
+            elif event.get('recurrence'):
+                self.singles.pop(event['id'], None)
+                self.masters[event['id']] = event
+                self._series.pop(event['id'], None)
+            else:
+                self.masters.pop(event['id'], None)
+                self.singles[event['id']] = event
+
+    def series(self, master_id: str):
+        if master_id not in self._series and master_id in self.masters:
+            self._series[master_id] = RecurringSeries(
+                self.masters[master_id], self.default_tz, list(self.exceptions.get(master_id, {}).values()))
+        return self._series.get(master_id)
+
+    def all_series(self):
+        return [self.series(master_id) for master_id in self.masters]
+
+    def singles_in_window(self, window_start: datetime, window_end: datetime):
+        events = []
+        for event in self.singles.values():
+            start, _ = parse_google_time(event['start'], self.default_tz)
+            end, _ = parse_google_time(event['end'], self.default_tz)
+            if start < _to_naive_local(window_end, self.default_tz) and end > _to_naive_local(window_start, self.default_tz):
+                events.append((start, event))
+        events.sort(key=lambda item: item[0])
+        return [event for _, event in events]
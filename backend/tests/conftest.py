@@ -0,0 +1,110 @@
+import httplib2
+import pytest
+import pytz
+from googleapiclient.errors import HttpError
+
+import calendar_mcp_server
+
+def http_error(status: int):
+    return HttpError(httplib2.Response({'status': status}), b'{}')
+
+class FakeRequest:
+    def __init__(self, respond):
+        self.respond = respond
+
+    def execute(self):
+        return self.respond()
+
+class FakeBatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+class FakeResource:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+class FakeCalendarService:
+    # Just enough of the Calendar v3 client for CalendarService and the tools
+    def __init__(self, calendars: list, events: dict = None):
+        self.calendars = calendars
+        self.events_by_calendar = events or {}
+        self.calls = []
+        self.expired_sync_tokens = set()
+        self.busy = {}
+        self.inserted = []
+
+    def _calendar(self, calendar_id: str):
+        # Google accepts 'primary' as an alias for the user's own calendar
+        if calendar_id == 'primary':
+            return next(cal['id'] for cal in self.calendars if cal.get('primary'))
+        return calendar_id
+
+    def _record(self, name: str, **params):
+        self.calls.append((name, params))
+
+    def calendarList(self):
+        def list_calendars(**params):
+            def respond():
+                self._record('calendarList.list', **params)
+                if params.get('syncToken') in self.expired_sync_tokens:
+                    raise http_error(410)
+                return {'items': list(self.calendars), 'nextSyncToken': f"cal-sync-{len(self.calls)}"}
+            return FakeRequest(respond)
+        return FakeResource(list=list_calendars)
+
+    def events(self):
+        def list_events(**params):
+            def respond():
+                self._record('events.list', **params)
+                calendar_id = self._calendar(params['calendarId'])
+                if calendar_id not in self.events_by_calendar:
+                    raise http_error(404)
+                return {'items': list(self.events_by_calendar[calendar_id]), 'nextSyncToken': f"sync-{len(self.calls)}"}
+            return FakeRequest(respond)
+
+        def insert(calendarId, body):
+            def respond():
+                self._record('events.insert', calendarId=calendarId)
+                event = dict(body, id=f"new{len(self.inserted)}")
+                self.inserted.append(event)
+                self.events_by_calendar.setdefault(self._calendar(calendarId), []).append(event)
+                return event
+            return FakeRequest(respond)
+        return FakeResource(list=list_events, insert=insert)
+
+    def freebusy(self):
+        def query(body):
+            def respond():
+                self._record('freebusy.query', **body)
+                return {'calendars': {item['id']: {'busy': self.busy.get(item['id'], [])} for item in body['items']}}
+            return FakeRequest(respond)
+        return FakeResource(query=query)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(callback)
+
+PRIMARY = {'id': 'me@example.com', 'summary': 'me@example.com', 'primary': True, 'timeZone': 'America/New_York'}
+TEAM = {'id': 'team@group.calendar.google.com', 'summary': 'Team', 'summaryOverride': 'Engineering'}
+HOLIDAYS = {'id': 'en.usa#holiday@group.v.calendar.google.com', 'summary': 'Holidays in United States'}
+
+@pytest.fixture
+def install_calendar(monkeypatch):
+    # Replaces the module's CalendarService with a fresh one backed by a fake client
+    def install(fake: FakeCalendarService):
+        service = calendar_mcp_server.CalendarService()
+        service.service = fake
+        service.user_timezone = pytz.timezone('America/New_York')
+        monkeypatch.setattr(calendar_mcp_server, 'calendar_service', service)
+        return service
+    return install
@@ -0,0 +1,102 @@
+import json
+
+import calendar_mcp_server
+from calendar_mcp_server import _merge_by_start, get_free_busy
+from conftest import HOLIDAYS, PRIMARY, TEAM, FakeCalendarService
+
+def test_resolve_calendar_ids_by_id_name_and_override(install_calendar):
+    service = install_calendar(FakeCalendarService([PRIMARY, TEAM, HOLIDAYS]))
+
+    assert service.resolve_calendar_ids('all') == [PRIMARY['id'], TEAM['id'], HOLIDAYS['id']]
+    assert service.resolve_calendar_ids('engineering, holidays in united states') == [TEAM['id'], HOLIDAYS['id']]
+    assert service.resolve_calendar_ids(TEAM['id']) == [TEAM['id']]
+    # Unknown ids are passed through so Google reports them per calendar
+    assert service.resolve_calendar_ids('room-42@resource.calendar.google.com') == ['room-42@resource.calendar.google.com']
+    assert service.resolve_calendar_ids(' , ') == [PRIMARY['id']]
+    assert service.resolve_calendar_ids('primary') == service.resolve_calendar_ids('Primary, me@example.com') == [PRIMARY['id']]
+
+def test_calendar_list_falls_back_to_full_sync_on_410(install_calendar):
+    fake = FakeCalendarService([PRIMARY, TEAM])
+    service = install_calendar(fake)
+    service.get_calendars()
+    first_token = service._calendar_sync_token
+
+    fake.expired_sync_tokens.add(first_token)
+    fake.calendars = [PRIMARY]
+    calendars = service.get_calendars(force_refresh=True)
+
+    assert [cal['id'] for cal in calendars] == [PRIMARY['id']]
+    assert [params.get('syncToken') for name, params in fake.calls] == [None, first_token, None]
+    assert service._calendar_sync_token not in (None, first_token)
+
+def test_merge_by_start_across_offsets_and_all_day(install_calendar):
+    install_calendar(FakeCalendarService([PRIMARY]))
+    kathmandu = [{'id': 'a', 'start': '2026-03-02T19:00:00+05:45'}, {'id': 'd', 'start': '2026-03-03T09:00:00+05:45'}]
+    new_york = [{'id': 'b', 'start': '2026-03-02T09:00:00-05:00'}, {'id': 'e', 'start': '2026-03-02T10:00:00-05:00'}]
+    all_day = [{'id': 'c', 'start': '2026-03-02'}]
+
+    merged = _merge_by_start([kathmandu, new_york, all_day])
+    # 'c' is midnight in the user's timezone (New York), 'a' is 13:15Z and 'd' is 03:15Z the next day
+    assert [event['id'] for event in merged] == ['c', 'a', 'b', 'e', 'd']
+    assert [event['id'] for event in _merge_by_start([kathmandu, new_york, all_day], 2)] == ['c', 'a']
+
+def test_free_busy_coalesces_overlapping_periods(install_calendar):
+    fake = FakeCalendarService([PRIMARY, TEAM])
+    fake.busy = {
+        PRIMARY['id']: [
+            {'start': '2026-03-02T14:00:00Z', 'end': '2026-03-02T15:00:00Z'},
+            {'start': '2026-03-02T18:00:00Z', 'end': '2026-03-02T19:00:00Z'},
+        ],
+        TEAM['id']: [
+            {'start': '2026-03-02T14:30:00Z', 'end': '2026-03-02T16:00:00Z'},
+            {'start': '2026-03-02T16:00:00Z', 'end': '2026-03-02T16:30:00Z'},
+        ],
+    }
+    install_calendar(fake)
+
+    result = json.loads(get_free_busy('2026-03-02T00:00:00', '2026-03-03T00:00:00'))
+    assert result['busy'] == [
+        {'start': '2026-03-02T09:00:00-05:00', 'end': '2026-03-02T11:30:00-05:00', 'calendars': [PRIMARY['id'], TEAM['id']]},
+        {'start': '2026-03-02T13:00:00-05:00', 'end': '2026-03-02T14:00:00-05:00', 'calendars': [PRIMARY['id']]},
+    ]
+    assert 'errors' not in result
+
+def test_events_response_has_one_shape():
+    assert json.loads(calendar_mcp_server._events_response([], {})) == {'events': []}
+    response = json.loads(calendar_mcp_server._events_response([{'id': 'a'}], {'x': ValueError('boom')}))
+    assert response == {'events': [{'id': 'a'}], 'errors': {'x': 'boom'}}
+
+def standup(event_id: str, hour: int):
+    return {
+        'id': event_id,
+        'summary': f'Standup {event_id}',
+        'start': {'dateTime': f'2026-03-02T{hour:02d}:00:00-05:00', 'timeZone': 'America/New_York'},
+        'end': {'dateTime': f'2026-03-02T{hour:02d}:30:00-05:00', 'timeZone': 'America/New_York'},
+        'recurrence': ['RRULE:FREQ=DAILY;COUNT=3'],
+    }
+
+def test_expanded_instances_keep_their_calendar(install_calendar):
+    install_calendar(FakeCalendarService([PRIMARY, TEAM], {
+        PRIMARY['id']: [standup('mine', 9)],
+        TEAM['id']: [standup('team', 10)],
+    }))
+
+    result = json.loads(calendar_mcp_server.list_events(
+        20, '2026-03-01T00:00:00', '2026-03-10T00:00:00', calendar_ids='primary,Engineering', expand_recurring=True))
+    tagged = {(event['id'].split('_')[0], event['calendar_id']) for event in result['events']}
+    assert tagged == {('mine', PRIMARY['id']), ('team', TEAM['id'])}
+    assert len(result['events']) == 6
+
+def test_primary_and_its_id_share_one_store(install_calendar):
+    fake = FakeCalendarService([PRIMARY, TEAM], {PRIMARY['id']: [], TEAM['id']: []})
+    service = install_calendar(fake)
+
+    assert json.loads(calendar_mcp_server.list_events(10, '2026-03-01T00:00:00', '2026-03-10T00:00:00', calendar_ids='all'))['events'] == []
+    calendar_mcp_server.create_event('Planning', '2026-03-03T14:00:00', '2026-03-03T15:00:00')
+    result = json.loads(calendar_mcp_server.list_events(10, '2026-03-01T00:00:00', '2026-03-10T00:00:00', calendar_ids='all'))
+
+    assert [event['summary'] for event in result['events']] == ['Planning']
+    assert set(service._event_stores) == {PRIMARY['id'], TEAM['id']}
+    synced = [params['calendarId'] for name, params in fake.calls if name == 'events.list']
+    assert synced.count(PRIMARY['id']) == 2 and 'primary' not in synced
+    assert all('showDeleted' not in params for name, params in fake.calls if name == 'events.list')
@@ -0,0 +1,32 @@
+import json
+
+from context_manager import ConversationContext
+
+def record_turns(context: ConversationContext, count: int):
+    for turn in range(count):
+        context.record_turn(f"question {turn}", f"answer {turn}", [('list_events', json.dumps([{'id': f'evt{turn}', 'summary': 'Sync'}]))])
+
+def test_long_query_does_not_discard_stored_context():
+    context = ConversationContext(token_budget=200)
+    record_turns(context, 6)
+    turns, summary_lines = list(context.turns), list(context.summary_lines)
+
+    history = context.build_history("q" * 900)
+
+    assert context.count_tokens(history, "q" * 900) > 0
+    assert context.turns == turns
+    assert context.summary_lines == summary_lines
+    assert context.build_history("short question")[-1].content == "answer 5"
+
+def test_history_is_trimmed_to_budget():
+    context = ConversationContext(token_budget=120)
+    record_turns(context, 6)
+    history = context.build_history("what's next?")
+    assert context.count_tokens(history, "what's next?") <= 120
+
+def test_record_turn_folds_into_rolling_summary():
+    context = ConversationContext(recent_turns=2)
+    record_turns(context, 5)
+    assert [turn['user'] for turn in context.turns] == ["question 3", "question 4"]
+    assert len(context.summary_lines) == 3
+    assert "list_events: 1 item(s) [id=evt0, summary=Sync]" in context.summary_lines[0]
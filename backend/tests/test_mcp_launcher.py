@@ -0,0 +1,39 @@
+import os
+import socket
+import stat
+import time
+
+import pytest
+
+import mcp_launcher
+
+def test_private_socket_path_is_in_a_0700_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    socket_path = mcp_launcher.private_socket_path()
+    directory = os.path.dirname(socket_path)
+
+    assert os.path.dirname(directory) == str(tmp_path)
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    mcp_launcher._check_private_dir(socket_path)
+
+def test_shared_directory_is_rejected(tmp_path):
+    os.chmod(tmp_path, 0o755)
+    with pytest.raises(PermissionError):
+        mcp_launcher._check_private_dir(str(tmp_path / 'zygote.sock'))
+
+def test_peer_check_accepts_same_user():
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        mcp_launcher._check_peer(left)
+
+def test_probe_reads_are_bounded():
+    read_fd, write_fd = os.pipe()
+    try:
+        os.write(write_fd, b'{"id": 1}\n{"id"')
+        lines = mcp_launcher._lines(read_fd, time.monotonic() + 0.2)
+        assert next(lines) == b'{"id": 1}'
+        with pytest.raises(TimeoutError):
+            next(lines)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
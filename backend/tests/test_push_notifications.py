@@ -0,0 +1,181 @@
+import asyncio
+import os
+import time
+
+import push_notifications
+from push_notifications import LocalGmailSource, WatchManager
+
+class FakeGoogle:
+    # Answers the Calendar requests WatchManager makes instead of googleapis.com
+    def __init__(self, calendar_ids: list, unsupported: tuple = ()):
+        self.calendar_ids = calendar_ids
+        self.unsupported = unsupported
+        self.calls = []
+        self.changed = {}
+        self.failing = set()
+
+    def __call__(self, session: dict, method: str, url: str, **kwargs):
+        self.calls.append((method, url))
+        if url in self.failing or any(f"/calendars/{calendar_id}/" in url for calendar_id in self.unsupported):
+            raise RuntimeError(f"400 pushNotSupportedForRequestedResource: {url}")
+        if url.endswith('/calendarList'):
+            return {'items': [{'id': calendar_id} for calendar_id in self.calendar_ids]}
+        if url.endswith('/watch'):
+            return {'resourceId': f"res-{len(self.calls)}", 'expiration': str(int((time.time() + 600) * 1000))}
+        if url.endswith('/events'):
+            return {'items': self.changed.get(url, [])}
+        return {}
+
+def make_manager(**kwargs):
+    notified = []
+
+    async def notify(session_id: str, payload: dict):
+        notified.append((session_id, payload))
+
+    return WatchManager(notify, **kwargs), notified
+
+def test_local_gmail_push_reaches_matching_session():
+    source = LocalGmailSource()
+    manager, notified = make_manager(gmail_source=source)
+
+    async def scenario():
+        await manager.register('alice', 'Alice@Example.com', 'token-a')
+        await manager.wait_until_watching('alice')
+        await manager.register('bob', 'bob@example.com', 'token-b')
+        await manager.wait_until_watching('bob')
+        await source.publish('alice@EXAMPLE.com', 42, [{'id': 'm1', 'sender': 'carol@example.com', 'subject': 'Lunch?', 'snippet': ''}])
+
+    asyncio.run(scenario())
+    assert len(notified) == 1
+    session_id, payload = notified[0]
+    assert session_id == 'alice'
+    assert payload['type'] == 'notification' and payload['source'] == 'gmail'
+    assert payload['emails'][0]['subject'] == 'Lunch?'
+    assert manager.gmail_watches['alice']['history_id'] == '42'
+    assert manager.gmail_watches['bob']['history_id'] == '0'
+
+def test_gmail_push_without_new_messages_moves_cursor_silently():
+    source = LocalGmailSource()
+    manager, notified = make_manager(gmail_source=source)
+
+    async def scenario():
+        await manager.register('alice', 'alice@example.com', 'token-a')
+        await manager.wait_until_watching('alice')
+        await source.publish('alice@example.com', 7)
+        await source.publish('alice@example.com', 9)
+
+    asyncio.run(scenario())
+    assert notified == []
+    assert manager.gmail_watches['alice']['history_id'] == '9'
+
+def test_renew_expiring_renews_and_drops_inactive_sessions(monkeypatch):
+    monkeypatch.setattr(push_notifications, '_google_request', FakeGoogle(['primary@example.com']))
+    source = LocalGmailSource()
+    active = {'alice', 'bob'}
+    manager, _ = make_manager(gmail_source=source, webhook_base_url='https://hooks.example.com/',
+                              session_active=lambda session_id: session_id in active)
+
+    async def scenario():
+        await manager.register('alice', 'alice@example.com', 'token-a')
+        await manager.wait_until_watching('alice')
+        await manager.register('bob', 'bob@example.com', 'token-b')
+        await manager.wait_until_watching('bob')
+        await source.publish('alice@example.com', 5)
+        old_channels = set(manager.channels)
+        manager.gmail_watches['alice']['expiration'] = time.time()
+
+        active.discard('bob')
+        await manager.renew_expiring()
+        return old_channels
+
+    old_channels = asyncio.run(scenario())
+    assert set(manager.sessions) == {'alice'}
+    assert set(manager.gmail_watches) == {'alice'}
+    # Channels inside the renewal margin are replaced and the old ones stopped
+    assert not old_channels & set(manager.channels)
+    assert {channel['session_id'] for channel in manager.channels.values()} == {'alice'}
+    assert len(manager.channels) == 2
+    # Renewal keeps the history cursor so nothing between the two watches is skipped
+    assert manager.gmail_watches['alice']['history_id'] == '5'
+    assert manager.gmail_watches['alice']['expiration'] > time.time() + push_notifications.RENEW_MARGIN
+
+def test_unregister_stops_all_watches(monkeypatch):
+    google = FakeGoogle(['primary@example.com', 'team@group.calendar.google.com'])
+    monkeypatch.setattr(push_notifications, '_google_request', google)
+    manager, _ = make_manager(gmail_source=LocalGmailSource(), webhook_base_url='https://hooks.example.com')
+
+    async def scenario():
+        await manager.register('alice', 'alice@example.com', 'token-a')
+        await manager.wait_until_watching('alice')
+        assert len(manager.channels) == 3
+        await manager.unregister('alice')
+
+    asyncio.run(scenario())
+    assert manager.sessions == {} and manager.channels == {} and manager.gmail_watches == {}
+    assert sum(1 for method, url in google.calls if url.endswith('/channels/stop')) == 3
+
+def test_calendar_push_looks_up_the_changed_calendar(monkeypatch, tmp_path):
+    google = FakeGoogle(['primary@example.com', 'team@group.calendar.google.com'])
+    team_events = f"{push_notifications.CALENDAR_API}/calendars/team%40group.calendar.google.com/events"
+    google.changed[team_events] = [{'id': 'e1', 'summary': 'Planning', 'status': 'confirmed', 'start': {'dateTime': '2026-03-02T10:00:00Z'}}]
+    monkeypatch.setattr(push_notifications, '_google_request', google)
+    manager, notified = make_manager(webhook_base_url='https://hooks.example.com')
+
+    async def scenario():
+        await manager.register('alice', 'alice@example.com', 'token-a', cache_dir=str(tmp_path))
+        await manager.wait_until_watching('alice')
+        channel_id, channel = next((channel_id, channel) for channel_id, channel in manager.channels.items()
+                                   if channel['calendar_id'] == 'team@group.calendar.google.com')
+        headers = {'x-goog-channel-id': channel_id, 'x-goog-channel-token': channel['token'], 'x-goog-resource-state': 'exists'}
+        assert manager.verify_calendar_push(headers)
+        await manager.handle_calendar_push(headers)
+
+    asyncio.run(scenario())
+    assert ('GET', team_events) in google.calls
+    assert notified[0][1]['changes'][0]['calendar_id'] == 'team@group.calendar.google.com'
+    assert os.path.exists(tmp_path / 'calendar.invalidated')
+    assert not os.path.exists(tmp_path / 'gmail.invalidated')
+
+def test_register_does_not_wait_for_watches(monkeypatch):
+    google = FakeGoogle(['primary@example.com', 'team@group.calendar.google.com', 'holidays'], unsupported=('holidays',))
+    monkeypatch.setattr(push_notifications, '_google_request', google)
+    manager, _ = make_manager(webhook_base_url='https://hooks.example.com')
+
+    async def scenario():
+        await manager.register('alice', 'alice@example.com', 'token-a')
+        opened_during_login = len(manager.channels)
+        await manager.wait_until_watching('alice')
+        # A calendar list change re-syncs channels without retrying calendars that reject push
+        await manager._sync_calendar_watches('alice')
+        return opened_during_login
+
+    assert asyncio.run(scenario()) == 0
+    assert sorted(channel['calendar_id'] or '' for channel in manager.channels.values()) == [
+        '', 'primary@example.com', 'team@group.calendar.google.com']
+    assert sum(1 for _, url in google.calls if '/calendars/holidays/' in url) == 1
+
+def test_failed_change_lookup_is_reported_on_next_push(monkeypatch):
+    google = FakeGoogle(['primary@example.com'])
+    events_url = f"{push_notifications.CALENDAR_API}/calendars/primary%40example.com/events"
+    google.changed[events_url] = [{'id': 'e1', 'summary': 'Planning', 'status': 'confirmed', 'start': {'date': '2026-03-02'}}]
+    monkeypatch.setattr(push_notifications, '_google_request', google)
+    manager, notified = make_manager(webhook_base_url='https://hooks.example.com')
+
+    async def scenario():
+        await manager.register('alice', 'alice@example.com', 'token-a')
+        await manager.wait_until_watching('alice')
+        channel_id, channel = next((channel_id, channel) for channel_id, channel in manager.channels.items()
+                                   if channel['resource'] == 'events')
+        headers = {'x-goog-channel-id': channel_id, 'x-goog-channel-token': channel['token'], 'x-goog-resource-state': 'exists'}
+        checked_at = channel['checked_at']
+
+        google.failing.add(events_url)
+        await manager.handle_calendar_push(headers)
+        assert channel['checked_at'] == checked_at and notified == []
+
+        google.failing.clear()
+        await manager.handle_calendar_push(headers)
+        assert channel['checked_at'] > checked_at
+
+    asyncio.run(scenario())
+    assert [change['summary'] for change in notified[0][1]['changes']] == ['Planning']
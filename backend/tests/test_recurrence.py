@@ -0,0 +1,150 @@
+from datetime import datetime
+
+import pytz
+
+from recurrence import RecurringSeries
+
+NEW_YORK = pytz.timezone('America/New_York')
+
+def timed_master(recurrence: list, start: str = '2026-03-02T09:00:00-05:00', end: str = '2026-03-02T09:30:00-05:00'):
+    return {
+        'id': 'standup',
+        'summary': 'Standup',
+        'start': {'dateTime': start, 'timeZone': 'America/New_York'},
+        'end': {'dateTime': end, 'timeZone': 'America/New_York'},
+        'recurrence': recurrence,
+    }
+
+def all_day_master(recurrence: list):
+    return {
+        'id': 'review',
+        'summary': 'Review day',
+        'start': {'date': '2026-03-02'},
+        'end': {'date': '2026-03-03'},
+        'recurrence': recurrence,
+    }
+
+def local(value: str):
+    return NEW_YORK.localize(datetime.fromisoformat(value))
+
+def days(series: RecurringSeries):
+    return [occurrence.strftime('%m-%d') for occurrence in series.occurrences()]
+
+def following(series: RecurringSeries, tail: list):
+    return RecurringSeries(dict(series.master, recurrence=tail), NEW_YORK)
+
+EXDATE_SERIES = ['RRULE:FREQ=DAILY;COUNT=10', 'EXDATE;TZID=America/New_York:20260304T090000']
+
+def test_exdate_removes_occurrence_but_not_count():
+    series = RecurringSeries(timed_master(EXDATE_SERIES), NEW_YORK)
+    assert days(series) == ['03-02', '03-03', '03-05', '03-06', '03-07', '03-08', '03-09', '03-10', '03-11']
+
+def test_split_count_ignores_exdates():
+    series = RecurringSeries(timed_master(EXDATE_SERIES), NEW_YORK)
+    head, tail = series.split_recurrence({'dateTime': '2026-03-09T09:00:00-04:00'})
+
+    assert tail[0] == 'RRULE:FREQ=DAILY;COUNT=3'
+    assert days(following(series, head)) == ['03-02', '03-03', '03-05', '03-06', '03-07', '03-08']
+    tail_series = RecurringSeries(timed_master(tail, '2026-03-09T09:00:00-04:00', '2026-03-09T09:30:00-04:00'), NEW_YORK)
+    assert days(tail_series) == ['03-09', '03-10', '03-11']
+
+def test_following_series_keeps_total_length():
+    series = RecurringSeries(timed_master(EXDATE_SERIES), NEW_YORK)
+    instance = series.make_instance(datetime(2026, 3, 8, 9, 0))
+    new_series = series.following_series(instance)
+
+    assert new_series['recurrence'][0] == 'RRULE:FREQ=DAILY;COUNT=4'
+    assert days(RecurringSeries(new_series | {'id': 'standup2'}, NEW_YORK)) == ['03-08', '03-09', '03-10', '03-11']
+
+def test_following_series_uses_original_time_of_moved_instance():
+    series = RecurringSeries(timed_master(['RRULE:FREQ=DAILY']), NEW_YORK)
+    instance = series.make_instance(datetime(2026, 3, 5, 9, 0))
+    instance['start'] = {'dateTime': '2026-03-05T11:00:00-05:00', 'timeZone': 'America/New_York'}
+    instance['end'] = {'dateTime': '2026-03-05T11:30:00-05:00', 'timeZone': 'America/New_York'}
+
+    new_series = series.following_series(instance)
+    assert new_series['start']['dateTime'] == '2026-03-05T09:00:00-05:00'
+    assert new_series['end']['dateTime'] == '2026-03-05T09:30:00-05:00'
+
+    moved = series.following_series(instance, local('2026-03-05T14:00:00'))
+    assert moved['start']['dateTime'] == '2026-03-05T14:00:00-05:00'
+    assert moved['end']['dateTime'] == '2026-03-05T14:30:00-05:00'
+
+def test_all_day_until_is_inclusive_date():
+    series = RecurringSeries(all_day_master(['RRULE:FREQ=WEEKLY;UNTIL=20260323']), NEW_YORK)
+    assert days(series) == ['03-02', '03-09', '03-16', '03-23']
+
+def test_all_day_split_ends_head_the_day_before():
+    series = RecurringSeries(all_day_master(['RRULE:FREQ=WEEKLY;UNTIL=20260323']), NEW_YORK)
+    head, tail = series.split_recurrence({'date': '2026-03-16'})
+
+    assert head == ['RRULE:FREQ=WEEKLY;UNTIL=20260315']
+    assert tail == ['RRULE:FREQ=WEEKLY;UNTIL=20260323']
+    assert days(following(series, head)) == ['03-02', '03-09']
+
+def test_moved_and_cancelled_exceptions():
+    moved = {
+        'id': 'standup_20260303T140000Z',
+        'recurringEventId': 'standup',
+        'status': 'confirmed',
+        'summary': 'Standup (moved)',
+        'originalStartTime': {'dateTime': '2026-03-03T09:00:00-05:00'},
+        'start': {'dateTime': '2026-03-04T15:00:00-05:00'},
+        'end': {'dateTime': '2026-03-04T15:30:00-05:00'},
+    }
+    cancelled = {
+        'id': 'standup_20260305T140000Z',
+        'recurringEventId': 'standup',
+        'status': 'cancelled',
+        'originalStartTime': {'dateTime': '2026-03-05T09:00:00-05:00'},
+        'start': {'dateTime': '2026-03-05T09:00:00-05:00'},
+        'end': {'dateTime': '2026-03-05T09:30:00-05:00'},
+    }
+    series = RecurringSeries(timed_master(['RRULE:FREQ=DAILY;COUNT=5']), NEW_YORK, [moved, cancelled])
+
+    instances = list(series.instances(local('2026-03-01T00:00:00'), local('2026-03-10T00:00:00')))
+    assert [event['start']['dateTime'] for event in instances] == [
+        '2026-03-02T09:00:00-05:00',
+        '2026-03-04T09:00:00-05:00',
+        '2026-03-04T15:00:00-05:00',
+        '2026-03-06T09:00:00-05:00',
+    ]
+    assert instances[2] is moved
+
+    summary = series.summarize(local('2026-03-01T00:00:00'), local('2026-03-10T00:00:00'))
+    assert summary['occurrences_in_window'] == 4
+    assert summary['modified_in_window'] == 1
+
+def test_moved_instance_outside_window_is_excluded():
+    moved = {
+        'id': 'standup_20260303T140000Z',
+        'recurringEventId': 'standup',
+        'originalStartTime': {'dateTime': '2026-03-03T09:00:00-05:00'},
+        'start': {'dateTime': '2026-03-20T09:00:00-04:00'},
+        'end': {'dateTime': '2026-03-20T09:30:00-04:00'},
+    }
+    series = RecurringSeries(timed_master(['RRULE:FREQ=DAILY;COUNT=3']), NEW_YORK, [moved])
+    instances = list(series.instances(local('2026-03-01T00:00:00'), local('2026-03-10T00:00:00')))
+    assert [event['start']['dateTime'][:10] for event in instances] == ['2026-03-02', '2026-03-04']
+
+def test_dst_keeps_local_hour():
+    series = RecurringSeries(timed_master(['RRULE:FREQ=DAILY;COUNT=3'], '2026-03-07T09:00:00-05:00', '2026-03-07T09:30:00-05:00'), NEW_YORK)
+    starts = [event['start']['dateTime'] for event in series.instances()]
+    assert starts == ['2026-03-07T09:00:00-05:00', '2026-03-08T09:00:00-04:00', '2026-03-09T09:00:00-04:00']
+
+def test_dst_split_until_is_utc():
+    series = RecurringSeries(timed_master(['RRULE:FREQ=DAILY'], '2026-03-07T09:00:00-05:00', '2026-03-07T09:30:00-05:00'), NEW_YORK)
+    head, _ = series.split_recurrence({'dateTime': '2026-03-09T09:00:00-04:00'})
+    assert head == ['RRULE:FREQ=DAILY;UNTIL=20260309T125959Z']
+    assert days(following(series, head)) == ['03-07', '03-08']
+
+def test_instance_id_format():
+    timed = RecurringSeries(timed_master(['RRULE:FREQ=DAILY']), NEW_YORK)
+    assert timed.instance_id(datetime(2026, 3, 2, 9, 0)) == 'standup_20260302T140000Z'
+    assert timed.instance_id(datetime(2026, 3, 9, 9, 0)) == 'standup_20260309T130000Z'
+
+    all_day = RecurringSeries(all_day_master(['RRULE:FREQ=WEEKLY']), NEW_YORK)
+    assert all_day.instance_id(datetime(2026, 3, 9)) == 'review_20260309'
+    assert [event['id'] for event in all_day.instances(local('2026-03-01T00:00:00'), local('2026-03-17T00:00:00'))] == [
+        'review_20260302', 'review_20260309', 'review_20260316'
+    ]
@@ -13,7 +13,7 @@ interface Message {
 }
 
 interface WebSocketMessage {
-  type: 'message' | 'response' | 'typing' | 'error' | 'ping' | 'pong';
+  type: 'message' | 'response' | 'typing' | 'error' | 'ping' | 'pong' | 'subscribe' | 'notification';
   message?: string;
 }
 
@@ -108,6 +108,10 @@ function App() {
       websocket.onopen = () => {
         console.log('Connected to WebSocket');
         setWs(websocket);
+        websocket.send(JSON.stringify({
+          type: 'subscribe',
+          sessionId: sessionId
+        }));
       };
 
       websocket.onmessage = (event) => {
@@ -121,6 +125,13 @@ function App() {
             sender: 'bot',
             timestamp: new Date()
           }]);
+        } else if (data.type === 'notification') {
+          setMessages(prev => [...prev, {
+            id: Date.now(),
+            text: data.message || '',
+            sender: 'bot',
+            timestamp: new Date()
+          }]);
         } else if (data.type === 'typing') {
           setIsTyping(true);
         } else if (data.type === 'error') {
@@ -160,7 +171,7 @@ function App() {
         websocket.close();
       }
     };
-  }, [isAuthenticated]);
+  }, [isAuthenticated, sessionId]);
 
   const sendMessage = () => {
     if (!inputMessage.trim() || !ws) return;